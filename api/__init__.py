@@ -1 +1 @@
-# API integration package
+# API integration package
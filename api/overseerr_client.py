@@ -0,0 +1,20 @@
+"""
+Shared async HTTP client for the Overseerr API.
+"""
+import httpx
+
+from config.constants import OVERSEERR_API_URL, OVERSEERR_API_KEY
+
+# One connection pool for every async Overseerr call, so TLS handshakes and
+# TCP slow-start are paid once instead of per request.
+CLIENT = httpx.AsyncClient(
+    base_url=OVERSEERR_API_URL or "",
+    headers={"X-Api-Key": OVERSEERR_API_KEY or ""},
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=60)
+)
+
+
+async def close_client():
+    """Close the shared client's connections, e.g. on bot shutdown."""
+    await CLIENT.aclose()
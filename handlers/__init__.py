@@ -1 +1 @@
-# Handlers package
+# Handlers package
@@ -8,10 +8,10 @@ from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
-from config.config_manager import load_config
 from api.request_manager import RequestManager
 from utils.telegram_utils import send_message
 from utils.error_handler import ErrorHandler
+from notifications.admin_notifications import is_admin
 
 logger = logging.getLogger(__name__)
 
@@ -654,13 +654,8 @@ async def cancel_pending_requests(query, context: ContextTypes.DEFAULT_TYPE):
 def is_admin_user(telegram_user_id: int) -> bool:
     """Check if user has admin privileges."""
     try:
-        config = load_config()
-        user_id_str = str(telegram_user_id)
-        user = config.get("users", {}).get(user_id_str, {})
-        
-        return (user.get("is_admin", False) and 
-                user.get("is_authorized", False) and 
-                not user.get("is_blocked", False))
+        # Set lookup against the cached admin IDs instead of re-reading the config
+        return is_admin(telegram_user_id)
                 
     except Exception as e:
         logger.error(f"Error checking admin status: {e}")
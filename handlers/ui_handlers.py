@@ -1,531 +1,590 @@
-"""
-UI handlers for settings menus, user management, and media display.
-"""
-import logging
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery
-from telegram.ext import ContextTypes
-
-from config.config_manager import load_config, save_config, is_command_allowed, user_is_authorized
-from config.constants import (
-    CURRENT_MODE, BotMode, PASSWORD, OVERSEERR_API_URL, DEFAULT_POSTER_URL, ISSUE_TYPES
-)
-from session.session_manager import (
-    load_user_session, get_saved_user_for_telegram_id, load_shared_session
-)
-from utils.telegram_utils import send_message, interpret_status, can_request_resolution, is_reportable
-from api.overseerr_api import get_overseerr_users, user_can_request_4k, get_tv_show_seasons, get_requestable_seasons
-from notifications.notification_manager import get_user_notification_settings
-
-logger = logging.getLogger(__name__)
-
-async def show_settings_menu(update_or_query, context: ContextTypes.DEFAULT_TYPE, is_admin=False):
-    """
-    Displays the settings menu tailored for users or admins with conditional buttons.
-    In Shared mode, only the admin can access settings. Manage Notifications button is only shown if an Overseerr user is selected.
-    """
-    if isinstance(update_or_query, Update):
-        telegram_user_id = update_or_query.effective_user.id
-        chat_id = update_or_query.effective_chat.id
-        message_thread_id = getattr(update_or_query.message, "message_thread_id", None)
-    elif isinstance(update_or_query, CallbackQuery):
-        telegram_user_id = update_or_query.from_user.id
-        chat_id = update_or_query.message.chat_id
-        message_thread_id = getattr(update_or_query.message, "message_thread_id", None)
-    else:
-        logger.error("Invalid argument type passed to show_settings_menu")
-        return
-
-    config = load_config()
-
-    # Check if command/query is allowed
-    if not is_command_allowed(chat_id, message_thread_id, config, telegram_user_id):
-        return
-
-    user_id_str = str(telegram_user_id)
-    user = config["users"].get(user_id_str, {})
-    is_admin = user.get("is_admin", False)
-
-    # In Shared mode, only the admin can access settings
-    if CURRENT_MODE == BotMode.SHARED and not is_admin:
-        logger.info(f"Non-admin {telegram_user_id} attempted to access settings in Shared mode; ignoring.")
-        return
-
-    # Restrict access if unauthorized
-    if PASSWORD and not user_is_authorized(telegram_user_id):
-        await send_message(
-            context,
-            chat_id,
-            "🔒 *Access Denied*\nPlease enter the bot's password via /start to access settings.",
-            message_thread_id=message_thread_id
-        )
-        return
-
-    # Refresh user data based on CURRENT_MODE
-    context.user_data.pop("overseerr_telegram_user_id", None)
-    context.user_data.pop("overseerr_user_name", None)
-    context.user_data.pop("session_data", None)
-    # Clear any previous media selection data to avoid conflicts
-    context.user_data.pop("selected_result", None)
-    context.user_data.pop("search_results", None)
-
-    if CURRENT_MODE == BotMode.NORMAL:
-        session_data = load_user_session(telegram_user_id)
-        if session_data and "cookie" in session_data:
-            context.user_data["session_data"] = session_data
-            context.user_data["overseerr_telegram_user_id"] = session_data["overseerr_telegram_user_id"]
-            context.user_data["overseerr_user_name"] = session_data.get("overseerr_user_name", "Unknown")
-            logger.info(f"Loaded Normal mode session for user {telegram_user_id}: {session_data['overseerr_telegram_user_id']}")
-    elif CURRENT_MODE == BotMode.API:
-        overseerr_user_id, overseerr_user_name = get_saved_user_for_telegram_id(telegram_user_id)
-        if overseerr_user_id:
-            context.user_data["overseerr_telegram_user_id"] = overseerr_user_id
-            context.user_data["overseerr_user_name"] = overseerr_user_name
-            logger.info(f"Loaded API mode user selection for {telegram_user_id}: {overseerr_user_id} ({overseerr_user_name})")
-    elif CURRENT_MODE == BotMode.SHARED:
-        shared_session = load_shared_session()
-        if shared_session and "cookie" in shared_session:
-            context.application.bot_data["shared_session"] = shared_session
-            context.user_data["overseerr_telegram_user_id"] = shared_session["overseerr_telegram_user_id"]
-            context.user_data["overseerr_user_name"] = shared_session.get("overseerr_user_name", "Shared User")
-            logger.info(f"Loaded Shared mode session for user {telegram_user_id}: {shared_session['overseerr_telegram_user_id']}")
-
-    # Get current Overseerr user info (if any)
-    overseerr_user_name = context.user_data.get("overseerr_user_name", "None selected")
-    overseerr_telegram_user_id = context.user_data.get("overseerr_telegram_user_id", "N/A")
-    user_info = f"{overseerr_user_name} ({overseerr_telegram_user_id}) ✅" if overseerr_telegram_user_id != "N/A" else "Not set ❌"
-
-    group_mode_status = "🟢 On" if config["group_mode"] else "🔴 Off"
-
-    if is_admin:
-        mode_symbols = {
-            BotMode.NORMAL: "🌟",
-            BotMode.API: "🔑",
-            BotMode.SHARED: "👥"
-        }
-        mode_symbol = mode_symbols.get(CURRENT_MODE, "❓")
-        text = (
-            "⚙️ *Admin Settings*\n\n"
-            f"🤖 *Bot Mode:* {mode_symbol} *{CURRENT_MODE.value.capitalize()}*\n"
-            f"👤 *Current User:* {user_info}\n"
-            f"👥 *Group Mode:* {group_mode_status}\n\n"
-            "Select an option below to manage your settings:\n"
-        )
-    else:
-        text = (
-            "⚙️ *Settings - Current User:*\n\n"
-            f"👤 {user_info}\n\n"
-            "Select an option below to manage your settings:\n"
-        )
-
-    keyboard = []
-    account_buttons = []
-    if CURRENT_MODE == BotMode.API:
-        account_buttons.append(InlineKeyboardButton("🔄 Change User", callback_data="change_user"))
-    elif CURRENT_MODE == BotMode.NORMAL:
-        if context.user_data.get("session_data"):
-            account_buttons.append(InlineKeyboardButton("🔓 Logout", callback_data="logout"))
-        else:
-            account_buttons.append(InlineKeyboardButton("🔑 Login", callback_data="login"))
-    elif CURRENT_MODE == BotMode.SHARED and is_admin:
-        if context.application.bot_data.get("shared_session"):
-            account_buttons.append(InlineKeyboardButton("🔓 Logout", callback_data="logout"))
-        else:
-            account_buttons.append(InlineKeyboardButton("🔑 Login", callback_data="login"))
-    if account_buttons:
-        keyboard.append(account_buttons)
-
-    if is_admin:
-        keyboard.extend([
-            [InlineKeyboardButton("🔧 Change Mode", callback_data="mode_select")],
-            [InlineKeyboardButton(f"👥 Group Mode: {group_mode_status}", callback_data="toggle_group_mode")],
-            [InlineKeyboardButton("👤 Manage Users", callback_data="manage_users")]
-        ])
-    
-    # Show Manage Notifications only if an Overseerr user is selected
-    if overseerr_telegram_user_id != "N/A":
-        keyboard.append([InlineKeyboardButton("🔔 Manage Notifications", callback_data="manage_notifications")])
-
-    keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_settings")])
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    if isinstance(update_or_query, Update):
-        await send_message(context, chat_id, text, reply_markup=reply_markup, message_thread_id=message_thread_id)
-    else:
-        # Use safe_edit_message instead of direct edit
-        try:
-            if hasattr(update_or_query, 'edit_message_text'):
-                # It's a query object
-                from .callback_handlers import safe_edit_message
-                await safe_edit_message(update_or_query, text, parse_mode="Markdown", reply_markup=reply_markup)
-            else:
-                # It's an update object, send new message
-                await update_or_query.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
-        except Exception as e:
-            logger.error(f"Error showing settings menu: {e}")
-            # Fallback
-            if hasattr(update_or_query, 'message'):
-                await update_or_query.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
-            else:
-                await update_or_query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
-
-async def display_results_with_buttons(update, context: ContextTypes.DEFAULT_TYPE, results, offset=0, search_query="", telegram_user_id=None):
-    """
-    Display search results with pagination buttons.
-    """
-    if not results:
-        await update.message.reply_text("No results to display.")
-        return
-
-    total_results = len(results)
-    results_to_show = results[offset:offset + 5]
-
-    # Just show the header - no duplicate text list
-    results_text = f"🔍 *Search results for:* {search_query}\n\n📊 *Showing {offset + 1}-{min(offset + 5, total_results)} of {total_results} results*\n\nSelect a result below:"
-
-    # Build keyboard
-    keyboard = []
-    for idx, result in enumerate(results_to_show):
-        button_text = f"{offset + idx + 1}. {result['title']} ({result['year']})"
-        callback_data = f"select_{offset + idx}"
-        keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
-
-    # Navigation buttons
-    nav_buttons = []
-    if offset > 0:
-        nav_buttons.append(InlineKeyboardButton("⬅️ Back", callback_data=f"page_{offset - 5}"))
-    
-    nav_buttons.append(InlineKeyboardButton("❌ Cancel", callback_data="cancel_search"))
-    
-    if offset + 5 < total_results:
-        nav_buttons.append(InlineKeyboardButton("➡️ More", callback_data=f"page_{offset + 5}"))
-    
-    keyboard.append(nav_buttons)
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    if hasattr(update, 'callback_query') and update.callback_query:
-        await update.callback_query.edit_message_text(
-            results_text, parse_mode="Markdown", reply_markup=reply_markup
-        )
-    else:
-        await update.message.reply_text(
-            results_text, parse_mode="Markdown", reply_markup=reply_markup
-        )
-
-async def build_media_details_message(result, context: ContextTypes.DEFAULT_TYPE, selected_seasons=None, request_more_mode=False):
-    """
-    Build media details message text and keyboard.
-    Returns tuple of (media_text, keyboard).
-    
-    Args:
-        result: Media information dictionary
-        context: Telegram context with user data
-        selected_seasons: Set of currently selected season numbers
-        request_more_mode: If True, only show unavailable seasons and modify UI accordingly
-    """
-    if selected_seasons is None:
-        selected_seasons = set()
-    
-    # Build detailed media info with conditional title
-    if request_more_mode:
-        media_text = f"📥 *REQUEST MORE SEASONS*\n\n"
-        media_text += f"🎬 *{result['title']}* ({result['year']})\n\n"
-        media_text += f"� *Select the seasons you want to request:*\n"
-        media_text += f"� *Tip: These are the seasons not yet available in your media server.*\n\n"
-    else:
-        media_text = f"🎬 *{result['title']}* ({result['year']})\n\n"
-        media_text += f"📺 *Type:* {result['mediaType'].upper()}\n"
-        media_text += f"🗓 *Release:* {result.get('release_date_full', 'Unknown')}\n\n"
-        media_text += f"📖 *Description:*\n{result['description'][:300]}{'...' if len(result['description']) > 300 else ''}\n\n"
-    
-    # Status information (skip in request_more_mode to save space and make content different)
-    if not request_more_mode:
-        hd_status = interpret_status(result['status_hd'])
-        k4_status = interpret_status(result['status_4k'])
-        media_text += f"📊 *Availability:*\n"
-        media_text += f"   • HD (1080p): {hd_status}\n"
-        media_text += f"   • 4K (UHD): {k4_status}\n"
-
-    # Build action buttons
-    keyboard = []
-    if request_more_mode:
-        back_button = InlineKeyboardButton("⬅️ Back to Details", callback_data="back_to_results")
-    else:
-        back_button = InlineKeyboardButton("⬅️ Back", callback_data="back_to_results")
-
-    overseerr_telegram_user_id = context.user_data.get("overseerr_telegram_user_id")
-    if overseerr_telegram_user_id:
-        # Request buttons
-        # In request_more_mode, always show seasons if available (we've already determined they're unavailable)
-        # In normal mode, check if we can request this resolution
-        can_show_request_buttons = request_more_mode or can_request_resolution(result['status_hd'])
-        
-        if can_show_request_buttons:
-            if result['mediaType'] == 'tv':
-                # Get seasons from cache
-                seasons = context.user_data.get(f"seasons_{result['id']}")
-                # In request_more_mode, show seasons even if there's only 1
-                # In normal mode, only show if there are multiple seasons
-                should_show_seasons = seasons and (request_more_mode or len(seasons) > 1)
-                
-                if should_show_seasons:
-                    # Show season selection
-                    for sn in seasons:
-                        is_selected = sn in selected_seasons
-                        emoji = "✅" if is_selected else "⭕"
-                        keyboard.append([
-                            InlineKeyboardButton(f"{emoji} Season {sn}", 
-                                               callback_data=f"toggle_season_{result['id']}_{sn}")
-                        ])
-                    if selected_seasons:
-                        keyboard.append([
-                            InlineKeyboardButton("📥 Request Selected Seasons", 
-                                               callback_data=f"finalize_seasons_{result['id']}")
-                        ])
-                
-                if request_more_mode:
-                    btn_1080p = InlineKeyboardButton("📥 Request All Remaining in 1080p", callback_data=f"confirm_1080p_{result['id']}")
-                else:
-                    btn_1080p = InlineKeyboardButton("📥 All in 1080p", callback_data=f"confirm_1080p_{result['id']}")
-            else:
-                btn_1080p = InlineKeyboardButton("📥 1080p", callback_data=f"confirm_1080p_{result['id']}")
-            
-            keyboard.append([btn_1080p])
-
-        if can_request_resolution(result['status_4k']) and user_can_request_4k(overseerr_telegram_user_id, result['mediaType']):
-            if result['mediaType'] == 'tv':
-                if request_more_mode:
-                    btn_4k = InlineKeyboardButton("📥 Request All Remaining in 4K", callback_data=f"confirm_4k_{result['id']}")
-                else:
-                    btn_4k = InlineKeyboardButton("📥 All in 4K", callback_data=f"confirm_4k_{result['id']}")
-            else:
-                btn_4k = InlineKeyboardButton("📥 4K", callback_data=f"confirm_4k_{result['id']}")
-            keyboard.append([btn_4k])
-
-        # Request More button for TV shows with unavailable seasons (but not in request_more_mode)
-        if result['mediaType'] == 'tv' and not request_more_mode:
-            try:
-                requestable_seasons = await get_requestable_seasons(result['id'])
-                if requestable_seasons:
-                    request_more_button = InlineKeyboardButton("📥 Request More", callback_data=f"request_more_{result['id']}")
-                    keyboard.append([request_more_button])
-            except Exception as e:
-                logger.warning(f"Failed to check unavailable seasons for {result['id']}: {e}")
-
-        # Report issue button
-        if is_reportable(result['status_hd']) or is_reportable(result['status_4k']):
-            overseerr_media_id = result.get('overseerr_id')
-            if overseerr_media_id:
-                report_button = InlineKeyboardButton("🛠 Report Issue", callback_data=f"report_{overseerr_media_id}")
-                keyboard.append([report_button])
-
-    keyboard.append([back_button])
-    return media_text, keyboard
-
-async def process_user_selection(update_or_query, context: ContextTypes.DEFAULT_TYPE, selection_index, telegram_user_id):
-    """
-    Process when user selects a specific media item from search results.
-    Can be called with either Update (from command) or CallbackQuery (from button).
-    """
-    # Handle both Update and CallbackQuery inputs
-    if hasattr(update_or_query, 'callback_query'):
-        # It's an Update object
-        query = update_or_query.callback_query
-        await query.answer()
-    else:
-        # It's already a CallbackQuery
-        query = update_or_query
-        await query.answer()
-    
-    search_results = context.user_data.get("search_results", [])
-    if selection_index >= len(search_results):
-        await query.edit_message_text("❌ Invalid selection. Please search again.")
-        return
-
-    result = search_results[selection_index]
-    context.user_data["selected_result"] = result
-
-    # Clear any previous season selections when viewing a new media item
-    previous_result = context.user_data.get("selected_result")
-    if not previous_result or previous_result.get('id') != result.get('id'):
-        context.user_data.pop('selected_seasons', None)
-
-    # Load authentication data based on current mode
-    config = load_config()
-    user_id_str = str(telegram_user_id)
-    user = config["users"].get(user_id_str, {})
-
-    # Initialize user authentication data
-    context.user_data.pop("overseerr_telegram_user_id", None)
-    context.user_data.pop("overseerr_user_name", None)
-    context.user_data.pop("session_data", None)
-
-    if CURRENT_MODE == BotMode.NORMAL:
-        session_data = load_user_session(telegram_user_id)
-        if session_data and "cookie" in session_data:
-            context.user_data["session_data"] = session_data
-            context.user_data["overseerr_telegram_user_id"] = session_data["overseerr_telegram_user_id"]
-            context.user_data["overseerr_user_name"] = session_data.get("overseerr_user_name", "Unknown")
-    elif CURRENT_MODE == BotMode.API:
-        overseerr_user_id, overseerr_user_name = get_saved_user_for_telegram_id(telegram_user_id)
-        if overseerr_user_id:
-            context.user_data["overseerr_telegram_user_id"] = overseerr_user_id
-            context.user_data["overseerr_user_name"] = overseerr_user_name
-    elif CURRENT_MODE == BotMode.SHARED:
-        shared_session = load_shared_session()
-        if shared_session and "cookie" in shared_session:
-            context.application.bot_data["shared_session"] = shared_session
-            context.user_data["overseerr_telegram_user_id"] = shared_session["overseerr_telegram_user_id"]
-            context.user_data["overseerr_user_name"] = shared_session.get("overseerr_user_name", "Shared User")
-
-    # Cache seasons data for TV shows if not already cached
-    if result['mediaType'] == 'tv':
-        seasons_key = f"seasons_{result['id']}"
-        if seasons_key not in context.user_data:
-            seasons = await get_tv_show_seasons(result['id'])
-            if seasons and len(seasons) > 1:
-                context.user_data[seasons_key] = seasons
-
-    # Get selected seasons for display
-    selected_seasons = set(context.user_data.get('selected_seasons', []))
-    
-    # Build media details using the new function
-    media_text, keyboard = await build_media_details_message(result, context, selected_seasons, request_more_mode=False)
-    
-    # Check if user is authenticated - if not, show authentication message
-    overseerr_telegram_user_id = context.user_data.get("overseerr_telegram_user_id")
-    if not overseerr_telegram_user_id:
-        auth_message = "🔐 *Authentication Required*\n\n"
-        auth_message += f"To request *{result['title']}*, please authenticate first using /settings"
-        
-        keyboard = [[InlineKeyboardButton("⚙️ Settings", callback_data="show_settings")]]
-        keyboard.append([InlineKeyboardButton("⬅️ Back", callback_data="back_to_results")])
-        media_text += f"\n\n{auth_message}"
-    
-    poster_url = f"https://image.tmdb.org/t/p/w500{result['poster']}" if result['poster'] else DEFAULT_POSTER_URL
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    # Send media info with poster using send_photo
-    try:
-        # Check if we're editing an existing message or creating new one
-        if hasattr(query, 'message') and query.message.photo:
-            # Edit existing photo message caption
-            msg = await query.edit_message_caption(
-                caption=media_text, parse_mode="Markdown", reply_markup=reply_markup
-            )
-        else:
-            # Delete the old message and send new photo message
-            try:
-                await query.message.delete()
-            except:
-                pass  # Ignore if deletion fails
-            
-            msg = await context.bot.send_photo(
-                chat_id=query.message.chat_id,
-                photo=poster_url,
-                caption=media_text,
-                parse_mode="Markdown",
-                reply_markup=reply_markup
-            )
-        context.user_data["media_message_id"] = msg.message_id
-    except Exception as e:
-        logger.error(f"Failed to send photo with media details: {e}")
-        # Fallback to text message if photo fails
-        try:
-            # Delete the old message first
-            try:
-                await query.message.delete()
-            except:
-                pass
-            
-            msg = await context.bot.send_message(
-                chat_id=query.message.chat_id,
-                text=media_text,
-                parse_mode="Markdown", 
-                reply_markup=reply_markup
-            )
-            context.user_data["media_message_id"] = msg.message_id
-        except Exception as e2:
-            logger.error(f"Failed to send message with media details: {e2}")
-            await query.message.reply_text(
-                media_text, parse_mode="Markdown", reply_markup=reply_markup
-            )
-
-async def handle_change_user(update_or_query, context: ContextTypes.DEFAULT_TYPE, is_initial=False, offset=0):
-    """
-    Display a paginated list of Overseerr users for API mode user selection.
-    """
-    if isinstance(update_or_query, Update):
-        telegram_user_id = update_or_query.effective_user.id
-        chat_id = update_or_query.effective_chat.id
-        message_thread_id = getattr(update_or_query.message, "message_thread_id", None)
-    else:  # CallbackQuery
-        telegram_user_id = update_or_query.from_user.id
-        chat_id = update_or_query.message.chat_id
-        message_thread_id = getattr(update_or_query.message, "message_thread_id", None)
-
-    config = load_config()
-    if not is_command_allowed(chat_id, message_thread_id, config, telegram_user_id):
-        return
-
-    if CURRENT_MODE != BotMode.API:
-        error_text = "User selection is only available in API Mode."
-        if isinstance(update_or_query, Update):
-            await send_message(context, chat_id, error_text, message_thread_id=message_thread_id)
-        else:
-            await update_or_query.edit_message_text(error_text)
-        return
-
-    users = get_overseerr_users()
-    if not users:
-        error_text = "❌ Unable to fetch users from Overseerr. Please check your API configuration."
-        if isinstance(update_or_query, Update):
-            await send_message(context, chat_id, error_text, message_thread_id=message_thread_id)
-        else:
-            await update_or_query.edit_message_text(error_text)
-        return
-
-    page_size = 8
-    total_users = len(users)
-    current_users = users[offset:offset + page_size]
-
-    current_user_id, current_user_name = get_saved_user_for_telegram_id(telegram_user_id)
-    
-    if is_initial and current_user_id:
-        message_text = (
-            f"🔄 *Change Overseerr User*\n\n"
-            f"Current: *{current_user_name}* (ID: {current_user_id})\n\n"
-            f"Select a new user from the list below:\n"
-        )
-    else:
-        message_text = f"👤 *Select Overseerr User*\n\nChoose from {total_users} available users:\n"
-
-    keyboard = []
-    for user in current_users:
-        user_id = user["id"]
-        display_name = user.get("displayName") or user.get("email", f"User {user_id}")
-        
-        # Mark current user
-        if user_id == current_user_id:
-            button_text = f"✅ {display_name} (Current)"
-        else:
-            button_text = display_name
-            
-        keyboard.append([InlineKeyboardButton(button_text, callback_data=f"select_user_{user_id}")])
-
-    # Navigation buttons
-    nav_buttons = []
-    if offset > 0:
-        nav_buttons.append(InlineKeyboardButton("⬅️ Back", callback_data=f"users_page_{offset - page_size}"))
-    if offset + page_size < total_users:
-        nav_buttons.append(InlineKeyboardButton("➡️ More", callback_data=f"users_page_{offset + page_size}"))
-    
-    if nav_buttons:
-        keyboard.append(nav_buttons)
-    
-    keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_user_selection")])
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    if isinstance(update_or_query, Update):
-        await send_message(context, chat_id, message_text, reply_markup=reply_markup, message_thread_id=message_thread_id)
-    elif isinstance(update_or_query, CallbackQuery):
-        await update_or_query.edit_message_text(message_text, parse_mode="Markdown", reply_markup=reply_markup)
+"""
+UI handlers for settings menus, user management, and media display.
+"""
+import logging
+import time
+from collections import OrderedDict
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery
+from telegram.ext import ContextTypes
+
+from config.config_manager import load_config, save_config, is_command_allowed, user_is_authorized
+from config.constants import (
+    CURRENT_MODE, BotMode, PASSWORD, OVERSEERR_API_URL, DEFAULT_POSTER_URL, ISSUE_TYPES
+)
+from session.session_manager import (
+    load_user_session, get_saved_user_for_telegram_id, load_shared_session
+)
+from utils.telegram_utils import send_message, interpret_status, can_request_resolution, is_reportable
+from api.overseerr_api import get_overseerr_users, user_can_request_4k, get_tv_show_seasons, get_requestable_seasons
+from notifications.notification_manager import get_user_notification_settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the bot-wide season list cache shared by all users
+SEASONS_CACHE_MAX_SIZE = 512
+# Season lists grow when new seasons air, so entries are refetched after this many seconds
+SEASONS_CACHE_TTL = 6 * 60 * 60
+
+# Settings keyboards only depend on a few flags, so each variant is built once and reused.
+# InlineKeyboardMarkup is immutable, which makes sharing the cached objects safe.
+_settings_kb_cache: dict[tuple, InlineKeyboardMarkup] = {}
+
+def get_settings_keyboard(mode: BotMode, is_admin: bool, has_session: bool, has_user: bool, group_mode: bool) -> InlineKeyboardMarkup:
+    """
+    Return the settings menu keyboard for the given state, building it on first use.
+    group_mode is part of the key, so toggling it never serves a stale label.
+    """
+    key = (mode, is_admin, has_session, has_user, group_mode)
+    reply_markup = _settings_kb_cache.get(key)
+    if reply_markup is not None:
+        return reply_markup
+
+    keyboard = []
+    account_buttons = []
+    if mode == BotMode.API:
+        account_buttons.append(InlineKeyboardButton("🔄 Change User", callback_data="change_user"))
+    elif mode == BotMode.NORMAL or (mode == BotMode.SHARED and is_admin):
+        if has_session:
+            account_buttons.append(InlineKeyboardButton("🔓 Logout", callback_data="logout"))
+        else:
+            account_buttons.append(InlineKeyboardButton("🔑 Login", callback_data="login"))
+    if account_buttons:
+        keyboard.append(account_buttons)
+
+    if is_admin:
+        group_mode_status = "🟢 On" if group_mode else "🔴 Off"
+        keyboard.extend([
+            [InlineKeyboardButton("🔧 Change Mode", callback_data="mode_select")],
+            [InlineKeyboardButton(f"👥 Group Mode: {group_mode_status}", callback_data="toggle_group_mode")],
+            [InlineKeyboardButton("👤 Manage Users", callback_data="manage_users")]
+        ])
+
+    # Show Manage Notifications only if an Overseerr user is selected
+    if has_user:
+        keyboard.append([InlineKeyboardButton("🔔 Manage Notifications", callback_data="manage_notifications")])
+
+    keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_settings")])
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    _settings_kb_cache[key] = reply_markup
+    return reply_markup
+
+def get_seasons_cache(context: ContextTypes.DEFAULT_TYPE) -> OrderedDict:
+    """
+    Return the bot-wide LRU cache of (fetched_at, seasons) entries keyed by media id.
+    Shared through bot_data so users viewing the same show reuse one Overseerr lookup.
+    """
+    return context.application.bot_data.setdefault("seasons_cache", OrderedDict())
+
+def get_cached_seasons(context: ContextTypes.DEFAULT_TYPE, media_id: int) -> list | None:
+    """
+    Return the cached season list for media_id, or None if it is missing or older than SEASONS_CACHE_TTL.
+    Expired entries are dropped so the next selection refetches them.
+    """
+    seasons_cache = get_seasons_cache(context)
+    entry = seasons_cache.get(media_id)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] >= SEASONS_CACHE_TTL:
+        del seasons_cache[media_id]
+        return None
+    return entry[1]
+
+async def show_settings_menu(update_or_query, context: ContextTypes.DEFAULT_TYPE, is_admin=False):
+    """
+    Displays the settings menu tailored for users or admins with conditional buttons.
+    In Shared mode, only the admin can access settings. Manage Notifications button is only shown if an Overseerr user is selected.
+    """
+    if isinstance(update_or_query, Update):
+        telegram_user_id = update_or_query.effective_user.id
+        chat_id = update_or_query.effective_chat.id
+        message_thread_id = getattr(update_or_query.message, "message_thread_id", None)
+    elif isinstance(update_or_query, CallbackQuery):
+        telegram_user_id = update_or_query.from_user.id
+        chat_id = update_or_query.message.chat_id
+        message_thread_id = getattr(update_or_query.message, "message_thread_id", None)
+    else:
+        logger.error("Invalid argument type passed to show_settings_menu")
+        return
+
+    config = load_config()
+
+    # Check if command/query is allowed
+    if not is_command_allowed(chat_id, message_thread_id, config, telegram_user_id):
+        return
+
+    user_id_str = str(telegram_user_id)
+    user = config["users"].get(user_id_str, {})
+    is_admin = user.get("is_admin", False)
+
+    # In Shared mode, only the admin can access settings
+    if CURRENT_MODE == BotMode.SHARED and not is_admin:
+        logger.info(f"Non-admin {telegram_user_id} attempted to access settings in Shared mode; ignoring.")
+        return
+
+    # Restrict access if unauthorized
+    if PASSWORD and not user_is_authorized(telegram_user_id):
+        await send_message(
+            context,
+            chat_id,
+            "🔒 *Access Denied*\nPlease enter the bot's password via /start to access settings.",
+            message_thread_id=message_thread_id
+        )
+        return
+
+    # Refresh user data based on CURRENT_MODE
+    context.user_data.pop("overseerr_telegram_user_id", None)
+    context.user_data.pop("overseerr_user_name", None)
+    context.user_data.pop("session_data", None)
+    # Clear any previous media selection data to avoid conflicts
+    context.user_data.pop("selected_result", None)
+    context.user_data.pop("search_results", None)
+
+    if CURRENT_MODE == BotMode.NORMAL:
+        session_data = load_user_session(telegram_user_id)
+        if session_data and "cookie" in session_data:
+            context.user_data["session_data"] = session_data
+            context.user_data["overseerr_telegram_user_id"] = session_data["overseerr_telegram_user_id"]
+            context.user_data["overseerr_user_name"] = session_data.get("overseerr_user_name", "Unknown")
+            logger.info(f"Loaded Normal mode session for user {telegram_user_id}: {session_data['overseerr_telegram_user_id']}")
+    elif CURRENT_MODE == BotMode.API:
+        overseerr_user_id, overseerr_user_name = get_saved_user_for_telegram_id(telegram_user_id)
+        if overseerr_user_id:
+            context.user_data["overseerr_telegram_user_id"] = overseerr_user_id
+            context.user_data["overseerr_user_name"] = overseerr_user_name
+            logger.info(f"Loaded API mode user selection for {telegram_user_id}: {overseerr_user_id} ({overseerr_user_name})")
+    elif CURRENT_MODE == BotMode.SHARED:
+        shared_session = load_shared_session()
+        if shared_session and "cookie" in shared_session:
+            context.application.bot_data["shared_session"] = shared_session
+            context.user_data["overseerr_telegram_user_id"] = shared_session["overseerr_telegram_user_id"]
+            context.user_data["overseerr_user_name"] = shared_session.get("overseerr_user_name", "Shared User")
+            logger.info(f"Loaded Shared mode session for user {telegram_user_id}: {shared_session['overseerr_telegram_user_id']}")
+
+    # Get current Overseerr user info (if any)
+    overseerr_user_name = context.user_data.get("overseerr_user_name", "None selected")
+    overseerr_telegram_user_id = context.user_data.get("overseerr_telegram_user_id", "N/A")
+    user_info = f"{overseerr_user_name} ({overseerr_telegram_user_id}) ✅" if overseerr_telegram_user_id != "N/A" else "Not set ❌"
+
+    group_mode_status = "🟢 On" if config["group_mode"] else "🔴 Off"
+
+    if is_admin:
+        mode_symbols = {
+            BotMode.NORMAL: "🌟",
+            BotMode.API: "🔑",
+            BotMode.SHARED: "👥"
+        }
+        mode_symbol = mode_symbols.get(CURRENT_MODE, "❓")
+        text = (
+            "⚙️ *Admin Settings*\n\n"
+            f"🤖 *Bot Mode:* {mode_symbol} *{CURRENT_MODE.value.capitalize()}*\n"
+            f"👤 *Current User:* {user_info}\n"
+            f"👥 *Group Mode:* {group_mode_status}\n\n"
+            "Select an option below to manage your settings:\n"
+        )
+    else:
+        text = (
+            "⚙️ *Settings - Current User:*\n\n"
+            f"👤 {user_info}\n\n"
+            "Select an option below to manage your settings:\n"
+        )
+
+    if CURRENT_MODE == BotMode.SHARED:
+        has_session = bool(context.application.bot_data.get("shared_session"))
+    else:
+        has_session = bool(context.user_data.get("session_data"))
+    reply_markup = get_settings_keyboard(
+        CURRENT_MODE, is_admin, has_session, overseerr_telegram_user_id != "N/A", config["group_mode"]
+    )
+
+    if isinstance(update_or_query, Update):
+        await send_message(context, chat_id, text, reply_markup=reply_markup, message_thread_id=message_thread_id)
+    else:
+        # Use safe_edit_message instead of direct edit
+        try:
+            if hasattr(update_or_query, 'edit_message_text'):
+                # It's a query object
+                from .callback_handlers import safe_edit_message
+                await safe_edit_message(update_or_query, text, parse_mode="Markdown", reply_markup=reply_markup)
+            else:
+                # It's an update object, send new message
+                await update_or_query.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+        except Exception as e:
+            logger.error(f"Error showing settings menu: {e}")
+            # Fallback
+            if hasattr(update_or_query, 'message'):
+                await update_or_query.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+            else:
+                await update_or_query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+
+async def display_results_with_buttons(update, context: ContextTypes.DEFAULT_TYPE, results, offset=0, search_query="", telegram_user_id=None):
+    """
+    Display search results with pagination buttons.
+    """
+    if not results:
+        await update.message.reply_text("No results to display.")
+        return
+
+    total_results = len(results)
+    results_to_show = results[offset:offset + 5]
+
+    # Just show the header - no duplicate text list
+    results_text = f"🔍 *Search results for:* {search_query}\n\n📊 *Showing {offset + 1}-{min(offset + 5, total_results)} of {total_results} results*\n\nSelect a result below:"
+
+    # Build keyboard
+    keyboard = []
+    for idx, result in enumerate(results_to_show):
+        button_text = f"{offset + idx + 1}. {result['title']} ({result['year']})"
+        callback_data = f"select_{offset + idx}"
+        keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
+
+    # Navigation buttons
+    nav_buttons = []
+    if offset > 0:
+        nav_buttons.append(InlineKeyboardButton("⬅️ Back", callback_data=f"page_{offset - 5}"))
+    
+    nav_buttons.append(InlineKeyboardButton("❌ Cancel", callback_data="cancel_search"))
+    
+    if offset + 5 < total_results:
+        nav_buttons.append(InlineKeyboardButton("➡️ More", callback_data=f"page_{offset + 5}"))
+    
+    keyboard.append(nav_buttons)
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    if hasattr(update, 'callback_query') and update.callback_query:
+        await update.callback_query.edit_message_text(
+            results_text, parse_mode="Markdown", reply_markup=reply_markup
+        )
+    else:
+        await update.message.reply_text(
+            results_text, parse_mode="Markdown", reply_markup=reply_markup
+        )
+
+async def build_media_details_message(result, context: ContextTypes.DEFAULT_TYPE, selected_seasons=None, request_more_mode=False):
+    """
+    Build media details message text and keyboard.
+    Returns tuple of (media_text, keyboard).
+    
+    Args:
+        result: Media information dictionary
+        context: Telegram context with user data
+        selected_seasons: Set of currently selected season numbers
+        request_more_mode: If True, only show unavailable seasons and modify UI accordingly
+    """
+    if selected_seasons is None:
+        selected_seasons = set()
+    
+    # Build detailed media info with conditional title
+    if request_more_mode:
+        media_text = f"📥 *REQUEST MORE SEASONS*\n\n"
+        media_text += f"🎬 *{result['title']}* ({result['year']})\n\n"
+        media_text += f"� *Select the seasons you want to request:*\n"
+        media_text += f"� *Tip: These are the seasons not yet available in your media server.*\n\n"
+    else:
+        media_text = f"🎬 *{result['title']}* ({result['year']})\n\n"
+        media_text += f"📺 *Type:* {result['mediaType'].upper()}\n"
+        media_text += f"🗓 *Release:* {result.get('release_date_full', 'Unknown')}\n\n"
+        description = result.get('short_description')
+        if description is None:
+            description = result['description']
+            if len(description) > 300:
+                description = description[:300] + '...'
+        media_text += f"📖 *Description:*\n{description}\n\n"
+    
+    # Status information (skip in request_more_mode to save space and make content different)
+    if not request_more_mode:
+        hd_status = interpret_status(result['status_hd'])
+        k4_status = interpret_status(result['status_4k'])
+        media_text += f"📊 *Availability:*\n"
+        media_text += f"   • HD (1080p): {hd_status}\n"
+        media_text += f"   • 4K (UHD): {k4_status}\n"
+
+    # Build action buttons
+    keyboard = []
+    if request_more_mode:
+        back_button = InlineKeyboardButton("⬅️ Back to Details", callback_data="back_to_results")
+    else:
+        back_button = InlineKeyboardButton("⬅️ Back", callback_data="back_to_results")
+
+    overseerr_telegram_user_id = context.user_data.get("overseerr_telegram_user_id")
+    if overseerr_telegram_user_id:
+        # Request buttons
+        # In request_more_mode, always show seasons if available (we've already determined they're unavailable)
+        # In normal mode, check if we can request this resolution
+        can_show_request_buttons = request_more_mode or can_request_resolution(result['status_hd'])
+        
+        if can_show_request_buttons:
+            if result['mediaType'] == 'tv':
+                # Per-user seasons (set by Request More) take precedence over the shared cache
+                seasons = context.user_data.get(f"seasons_{result['id']}")
+                if seasons is None and not request_more_mode:
+                    seasons = get_cached_seasons(context, result['id'])
+                # In request_more_mode, show seasons even if there's only 1
+                # In normal mode, only show if there are multiple seasons
+                should_show_seasons = seasons and (request_more_mode or len(seasons) > 1)
+                
+                if should_show_seasons:
+                    # Show season selection
+                    for sn in seasons:
+                        is_selected = sn in selected_seasons
+                        emoji = "✅" if is_selected else "⭕"
+                        keyboard.append([
+                            InlineKeyboardButton(f"{emoji} Season {sn}", 
+                                               callback_data=f"toggle_season_{result['id']}_{sn}")
+                        ])
+                    if selected_seasons:
+                        keyboard.append([
+                            InlineKeyboardButton("📥 Request Selected Seasons", 
+                                               callback_data=f"finalize_seasons_{result['id']}")
+                        ])
+                
+                if request_more_mode:
+                    btn_1080p = InlineKeyboardButton("📥 Request All Remaining in 1080p", callback_data=f"confirm_1080p_{result['id']}")
+                else:
+                    btn_1080p = InlineKeyboardButton("📥 All in 1080p", callback_data=f"confirm_1080p_{result['id']}")
+            else:
+                btn_1080p = InlineKeyboardButton("📥 1080p", callback_data=f"confirm_1080p_{result['id']}")
+            
+            keyboard.append([btn_1080p])
+
+        if can_request_resolution(result['status_4k']) and user_can_request_4k(overseerr_telegram_user_id, result['mediaType']):
+            if result['mediaType'] == 'tv':
+                if request_more_mode:
+                    btn_4k = InlineKeyboardButton("📥 Request All Remaining in 4K", callback_data=f"confirm_4k_{result['id']}")
+                else:
+                    btn_4k = InlineKeyboardButton("📥 All in 4K", callback_data=f"confirm_4k_{result['id']}")
+            else:
+                btn_4k = InlineKeyboardButton("📥 4K", callback_data=f"confirm_4k_{result['id']}")
+            keyboard.append([btn_4k])
+
+        # Request More button for TV shows with unavailable seasons (but not in request_more_mode)
+        if result['mediaType'] == 'tv' and not request_more_mode:
+            try:
+                requestable_seasons = await get_requestable_seasons(result['id'])
+                if requestable_seasons:
+                    request_more_button = InlineKeyboardButton("📥 Request More", callback_data=f"request_more_{result['id']}")
+                    keyboard.append([request_more_button])
+            except Exception as e:
+                logger.warning(f"Failed to check unavailable seasons for {result['id']}: {e}")
+
+        # Report issue button
+        if is_reportable(result['status_hd']) or is_reportable(result['status_4k']):
+            overseerr_media_id = result.get('overseerr_id')
+            if overseerr_media_id:
+                report_button = InlineKeyboardButton("🛠 Report Issue", callback_data=f"report_{overseerr_media_id}")
+                keyboard.append([report_button])
+
+    keyboard.append([back_button])
+    return media_text, keyboard
+
+async def process_user_selection(update_or_query, context: ContextTypes.DEFAULT_TYPE, selection_index, telegram_user_id):
+    """
+    Process when user selects a specific media item from search results.
+    Can be called with either Update (from command) or CallbackQuery (from button).
+    """
+    # Handle both Update and CallbackQuery inputs
+    if hasattr(update_or_query, 'callback_query'):
+        # It's an Update object
+        query = update_or_query.callback_query
+        await query.answer()
+    else:
+        # It's already a CallbackQuery
+        query = update_or_query
+        await query.answer()
+    
+    search_results = context.user_data.get("search_results", [])
+    if selection_index >= len(search_results):
+        await query.edit_message_text("❌ Invalid selection. Please search again.")
+        return
+
+    result = search_results[selection_index]
+    context.user_data["selected_result"] = result
+
+    # Clear any previous season selections when viewing a new media item
+    previous_result = context.user_data.get("selected_result")
+    if not previous_result or previous_result.get('id') != result.get('id'):
+        context.user_data.pop('selected_seasons', None)
+
+    # Load authentication data based on current mode
+    config = load_config()
+    user_id_str = str(telegram_user_id)
+    user = config["users"].get(user_id_str, {})
+
+    # Initialize user authentication data
+    context.user_data.pop("overseerr_telegram_user_id", None)
+    context.user_data.pop("overseerr_user_name", None)
+    context.user_data.pop("session_data", None)
+
+    if CURRENT_MODE == BotMode.NORMAL:
+        session_data = load_user_session(telegram_user_id)
+        if session_data and "cookie" in session_data:
+            context.user_data["session_data"] = session_data
+            context.user_data["overseerr_telegram_user_id"] = session_data["overseerr_telegram_user_id"]
+            context.user_data["overseerr_user_name"] = session_data.get("overseerr_user_name", "Unknown")
+    elif CURRENT_MODE == BotMode.API:
+        overseerr_user_id, overseerr_user_name = get_saved_user_for_telegram_id(telegram_user_id)
+        if overseerr_user_id:
+            context.user_data["overseerr_telegram_user_id"] = overseerr_user_id
+            context.user_data["overseerr_user_name"] = overseerr_user_name
+    elif CURRENT_MODE == BotMode.SHARED:
+        shared_session = load_shared_session()
+        if shared_session and "cookie" in shared_session:
+            context.application.bot_data["shared_session"] = shared_session
+            context.user_data["overseerr_telegram_user_id"] = shared_session["overseerr_telegram_user_id"]
+            context.user_data["overseerr_user_name"] = shared_session.get("overseerr_user_name", "Shared User")
+
+    # Cache seasons data for TV shows if not already cached
+    if result['mediaType'] == 'tv':
+        seasons_cache = get_seasons_cache(context)
+        if get_cached_seasons(context, result['id']) is not None:
+            seasons_cache.move_to_end(result['id'])
+        else:
+            seasons = await get_tv_show_seasons(result['id'])
+            if seasons:
+                seasons_cache[result['id']] = (time.monotonic(), seasons)
+                if len(seasons_cache) > SEASONS_CACHE_MAX_SIZE:
+                    seasons_cache.popitem(last=False)
+
+    # Get selected seasons for display
+    selected_seasons = set(context.user_data.get('selected_seasons', []))
+    
+    # Build media details using the new function
+    media_text, keyboard = await build_media_details_message(result, context, selected_seasons, request_more_mode=False)
+    
+    # Check if user is authenticated - if not, show authentication message
+    overseerr_telegram_user_id = context.user_data.get("overseerr_telegram_user_id")
+    if not overseerr_telegram_user_id:
+        auth_message = "🔐 *Authentication Required*\n\n"
+        auth_message += f"To request *{result['title']}*, please authenticate first using /settings"
+        
+        keyboard = [[InlineKeyboardButton("⚙️ Settings", callback_data="show_settings")]]
+        keyboard.append([InlineKeyboardButton("⬅️ Back", callback_data="back_to_results")])
+        media_text += f"\n\n{auth_message}"
+    
+    poster_url = f"https://image.tmdb.org/t/p/w500{result['poster']}" if result['poster'] else DEFAULT_POSTER_URL
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    # Send media info with poster using send_photo
+    try:
+        # Check if we're editing an existing message or creating new one
+        if hasattr(query, 'message') and query.message.photo:
+            # Edit existing photo message caption
+            msg = await query.edit_message_caption(
+                caption=media_text, parse_mode="Markdown", reply_markup=reply_markup
+            )
+        else:
+            # Delete the old message and send new photo message
+            try:
+                await query.message.delete()
+            except:
+                pass  # Ignore if deletion fails
+            
+            msg = await context.bot.send_photo(
+                chat_id=query.message.chat_id,
+                photo=poster_url,
+                caption=media_text,
+                parse_mode="Markdown",
+                reply_markup=reply_markup
+            )
+        context.user_data["media_message_id"] = msg.message_id
+    except Exception as e:
+        logger.error(f"Failed to send photo with media details: {e}")
+        # Fallback to text message if photo fails
+        try:
+            # Delete the old message first
+            try:
+                await query.message.delete()
+            except:
+                pass
+            
+            msg = await context.bot.send_message(
+                chat_id=query.message.chat_id,
+                text=media_text,
+                parse_mode="Markdown", 
+                reply_markup=reply_markup
+            )
+            context.user_data["media_message_id"] = msg.message_id
+        except Exception as e2:
+            logger.error(f"Failed to send message with media details: {e2}")
+            await query.message.reply_text(
+                media_text, parse_mode="Markdown", reply_markup=reply_markup
+            )
+
+async def handle_change_user(update_or_query, context: ContextTypes.DEFAULT_TYPE, is_initial=False, offset=0):
+    """
+    Display a paginated list of Overseerr users for API mode user selection.
+    """
+    if isinstance(update_or_query, Update):
+        telegram_user_id = update_or_query.effective_user.id
+        chat_id = update_or_query.effective_chat.id
+        message_thread_id = getattr(update_or_query.message, "message_thread_id", None)
+    else:  # CallbackQuery
+        telegram_user_id = update_or_query.from_user.id
+        chat_id = update_or_query.message.chat_id
+        message_thread_id = getattr(update_or_query.message, "message_thread_id", None)
+
+    config = load_config()
+    if not is_command_allowed(chat_id, message_thread_id, config, telegram_user_id):
+        return
+
+    if CURRENT_MODE != BotMode.API:
+        error_text = "User selection is only available in API Mode."
+        if isinstance(update_or_query, Update):
+            await send_message(context, chat_id, error_text, message_thread_id=message_thread_id)
+        else:
+            await update_or_query.edit_message_text(error_text)
+        return
+
+    users = get_overseerr_users()
+    if not users:
+        error_text = "❌ Unable to fetch users from Overseerr. Please check your API configuration."
+        if isinstance(update_or_query, Update):
+            await send_message(context, chat_id, error_text, message_thread_id=message_thread_id)
+        else:
+            await update_or_query.edit_message_text(error_text)
+        return
+
+    page_size = 8
+    total_users = len(users)
+    current_users = users[offset:offset + page_size]
+
+    current_user_id, current_user_name = get_saved_user_for_telegram_id(telegram_user_id)
+    
+    if is_initial and current_user_id:
+        message_text = (
+            f"🔄 *Change Overseerr User*\n\n"
+            f"Current: *{current_user_name}* (ID: {current_user_id})\n\n"
+            f"Select a new user from the list below:\n"
+        )
+    else:
+        message_text = f"👤 *Select Overseerr User*\n\nChoose from {total_users} available users:\n"
+
+    keyboard = []
+    for user in current_users:
+        user_id = user["id"]
+        display_name = user.get("displayName") or user.get("email", f"User {user_id}")
+        
+        # Mark current user
+        if user_id == current_user_id:
+            button_text = f"✅ {display_name} (Current)"
+        else:
+            button_text = display_name
+            
+        keyboard.append([InlineKeyboardButton(button_text, callback_data=f"select_user_{user_id}")])
+
+    # Navigation buttons
+    nav_buttons = []
+    if offset > 0:
+        nav_buttons.append(InlineKeyboardButton("⬅️ Back", callback_data=f"users_page_{offset - page_size}"))
+    if offset + page_size < total_users:
+        nav_buttons.append(InlineKeyboardButton("➡️ More", callback_data=f"users_page_{offset + page_size}"))
+    
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+    
+    keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_user_selection")])
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    if isinstance(update_or_query, Update):
+        await send_message(context, chat_id, message_text, reply_markup=reply_markup, message_thread_id=message_thread_id)
+    elif isinstance(update_or_query, CallbackQuery):
+        await update_or_query.edit_message_text(message_text, parse_mode="Markdown", reply_markup=reply_markup)
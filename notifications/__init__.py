@@ -1 +1 @@
-# Notifications package
+# Notifications package
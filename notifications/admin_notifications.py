@@ -3,15 +3,119 @@ Admin notification system for Overseerr request management.
 Handles sending notifications to admin users when new requests are submitted.
 """
 import logging
+import asyncio
+import html
+import time
+from collections import deque
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
-from config.config_manager import load_config
-from utils.telegram_utils import send_message
+from config.config_manager import load_cached_config
 
 logger = logging.getLogger(__name__)
 
+# Based on Overseerr webhook documentation
+_NEW_REQUEST_INDICATORS = frozenset({"MEDIA_PENDING", "request.new", "request.pending"})
+
+# Media fields tried in order when looking for a display title
+_TITLE_KEYS = ('title', 'name', 'originalTitle', 'originalName')
+
+_EMOJI_MAP = {
+    'movie': '🎬',
+    'tv': '📺',
+    'anime': '🌸',
+    'unknown': '📽️'
+}
+
+# Static parts of the admin notification, built once at import
+_VIEW_ALL_ROW = (InlineKeyboardButton("📋 View All Pending", callback_data="admin_pending_all"),)
+
+# HTML rather than Markdown: usernames with '_' or '*' can't break the formatting.
+# Every field substituted into the template must be passed through html.escape().
+_MESSAGE_TEMPLATE = (
+    "🔔 <b>New Request Notification</b>\n"
+    "👤 {requester} has requested:\n"
+    "\n"
+    "{emoji} <b>{title} ({year})</b> - {genres}\n"
+    "📝 {overview}\n"
+    "💿 Quality: {quality}\n"
+    "📅 Requested: {time}\n"
+    "\n"
+    "Choose an action:"
+)
+
+class RateLimiter:
+    """
+    Sliding-window limiter allowing at most max_rate acquisitions per period seconds.
+    Used as `async with limiter:` around Telegram sends to stay below the bot API cap.
+    """
+    
+    def __init__(self, max_rate: int, period: float = 1.0):
+        self.max_rate = max_rate
+        self.period = period
+        self._timestamps = deque()
+    
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            while self._timestamps and now - self._timestamps[0] >= self.period:
+                self._timestamps.popleft()
+            if len(self._timestamps) < self.max_rate:
+                self._timestamps.append(now)
+                return
+            await asyncio.sleep(self.period - (now - self._timestamps[0]))
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+# Telegram allows ~30 messages per second globally; keep some headroom
+_SEND_LIMITER = RateLimiter(25, 1.0)
+
+# Admin list derived from the shared cached config; rebuilt whenever load_cached_config returns a new dict
+_ADMIN_CACHE = {"config": None, "value": None, "ids": (), "id_set": frozenset()}
+
+
+def _get_cached_admins() -> List[Dict[str, Any]]:
+    """Return the cached list of active admins, rescanning the config when it has been reloaded."""
+    try:
+        config = load_cached_config()
+        if config is _ADMIN_CACHE["config"]:
+            return _ADMIN_CACHE["value"]
+        
+        users = config.get("users", {})
+        
+        admin_users = []
+        for user_id_str, user_data in users.items():
+            if (user_data.get("is_admin", False) and 
+                user_data.get("is_authorized", False) and 
+                not user_data.get("is_blocked", False)):
+                admin_users.append({
+                    "user_id": int(user_id_str),
+                    "username": user_data.get("username", "Unknown"),
+                    "chat_id": int(user_id_str)  # For private chat notifications
+                })
+        
+        logger.info(f"Found {len(admin_users)} active admin users")
+        ids = tuple(admin["user_id"] for admin in admin_users)
+        _ADMIN_CACHE.update(value=admin_users, ids=ids, id_set=frozenset(ids), config=config)
+        return admin_users
+        
+    except Exception as e:
+        logger.error(f"Error getting admin users: {e}")
+        return []
+
+
+def is_admin(telegram_user_id: int) -> bool:
+    """Check whether a Telegram user is an active (authorized, unblocked) admin."""
+    _get_cached_admins()
+    return telegram_user_id in _ADMIN_CACHE["id_set"]
+
 
 class AdminNotificationManager:
     """Manages admin notifications for new media requests."""
@@ -19,35 +123,26 @@ class AdminNotificationManager:
     def __init__(self, bot_instance):
         """Initialize with bot instance for sending messages."""
         self.bot = bot_instance
+        self.debounce_delay = 0.5  # Seconds to wait for duplicate webhooks of one request
+        self.max_concurrent_sends = 20  # In-flight Telegram requests per broadcast
+        self._pending: Dict[int, asyncio.TimerHandle] = {}
+        self._pending_info: Dict[int, Dict[str, Any]] = {}
+        self._flush_tasks = set()
     
     def get_admin_users(self) -> List[Dict[str, Any]]:
         """
         Get list of admin users from bot configuration.
+        Results are cached until the configuration is saved or the config file changes.
         
         Returns:
             List of admin user dictionaries with user_id and username
         """
-        try:
-            config = load_config()
-            users = config.get("users", {})
-            
-            admin_users = []
-            for user_id_str, user_data in users.items():
-                if (user_data.get("is_admin", False) and 
-                    user_data.get("is_authorized", False) and 
-                    not user_data.get("is_blocked", False)):
-                    admin_users.append({
-                        "user_id": int(user_id_str),
-                        "username": user_data.get("username", "Unknown"),
-                        "chat_id": int(user_id_str)  # For private chat notifications
-                    })
-            
-            logger.info(f"Found {len(admin_users)} active admin users")
-            return admin_users
-            
-        except Exception as e:
-            logger.error(f"Error getting admin users: {e}")
-            return []
+        return list(_get_cached_admins())
+    
+    def get_admin_ids(self) -> tuple:
+        """Get the Telegram user IDs of active admins, using the same cache as get_admin_users."""
+        _get_cached_admins()
+        return _ADMIN_CACHE["ids"]
     
     async def process_new_request_webhook(self, webhook_data: Dict[str, Any]) -> None:
         """
@@ -63,7 +158,7 @@ class AdminNotificationManager:
             
             # Check if this is a new request event
             if not self.is_new_request_event(notification_type, event):
-                logger.debug(f"Ignoring non-request event: {notification_type}/{event}")
+                logger.debug("Ignoring non-request event: %s/%s", notification_type, event)
                 return
             
             # Extract request information
@@ -72,6 +167,34 @@ class AdminNotificationManager:
                 logger.warning("Could not extract request information from webhook")
                 return
             
+            # Overseerr may fire several events for one request; only notify once the burst settles
+            request_id = request_info['request_id']
+            self._pending_info[request_id] = request_info
+            handle = self._pending.pop(request_id, None)
+            if handle:
+                handle.cancel()
+            loop = asyncio.get_running_loop()
+            self._pending[request_id] = loop.call_later(
+                self.debounce_delay, self._schedule_flush, request_id
+            )
+            
+        except Exception as e:
+            logger.error(f"Error processing new request webhook: {e}")
+    
+    def _schedule_flush(self, request_id: int) -> None:
+        """Start the flush for a request whose debounce window has expired."""
+        self._pending.pop(request_id, None)
+        task = asyncio.create_task(self._flush(request_id))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush(self, request_id: int) -> None:
+        """Send the admin notification for the latest webhook seen for a request."""
+        request_info = self._pending_info.pop(request_id, None)
+        if not request_info:
+            return
+        
+        try:
             # Get admin users
             admin_users = self.get_admin_users()
             if not admin_users:
@@ -85,7 +208,7 @@ class AdminNotificationManager:
             await self.send_admin_notifications(admin_users, message_text, inline_keyboard)
             
         except Exception as e:
-            logger.error(f"Error processing new request webhook: {e}")
+            logger.error(f"Error sending admin notification for request {request_id}: {e}")
     
     def is_new_request_event(self, notification_type: str, event: str) -> bool:
         """
@@ -98,15 +221,8 @@ class AdminNotificationManager:
         Returns:
             True if this is a new request event, False otherwise
         """
-        # Based on Overseerr webhook documentation
-        new_request_indicators = [
-            "MEDIA_PENDING",
-            "request.new", 
-            "request.pending"
-        ]
-        
-        return (notification_type in new_request_indicators or 
-                event in new_request_indicators)
+        return (notification_type in _NEW_REQUEST_INDICATORS or 
+                event in _NEW_REQUEST_INDICATORS)
     
     def extract_request_info(self, webhook_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -119,8 +235,8 @@ class AdminNotificationManager:
             Dictionary with structured request information, or None on error
         """
         try:
-            media = webhook_data.get('media', {})
-            request = webhook_data.get('request', {})
+            media = webhook_data.get('media') or {}
+            request = webhook_data.get('request') or {}
             
             # Extract basic information
             request_info = {
@@ -130,10 +246,11 @@ class AdminNotificationManager:
                 'year': self.extract_year(media),
                 'poster_path': media.get('posterPath'),
                 'overview': media.get('overview', 'No description available'),
-                'genres': [g.get('name', '') for g in media.get('genres', [])],
+                'genres': [g.get('name', '') for g in media.get('genres') or ()],
                 'quality': '4K' if request.get('is4k', False) else 'HD',
                 'requested_by': self.extract_requester_info(request),
                 'requested_at': request.get('createdAt'),
+                'requested_at_dt': self.parse_request_time(request.get('createdAt')),
                 'tmdb_id': media.get('tmdbId')
             }
             
@@ -150,22 +267,22 @@ class AdminNotificationManager:
     
     def extract_title(self, media: Dict[str, Any]) -> str:
         """Extract media title from media data."""
-        return (media.get('title') or 
-                media.get('name') or 
-                media.get('originalTitle') or 
-                media.get('originalName') or 
-                'Unknown Title')
+        for key in _TITLE_KEYS:
+            title = media.get(key)
+            if title:
+                return title
+        return 'Unknown Title'
     
     def extract_year(self, media: Dict[str, Any]) -> str:
         """Extract release year from media data."""
         release_date = media.get('releaseDate') or media.get('firstAirDate', '')
         if release_date and '-' in release_date:
-            return release_date.split('-')[0]
+            return release_date[:release_date.index('-')]
         return 'Unknown Year'
     
     def extract_requester_info(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Extract requester information from request data."""
-        requested_by = request.get('requestedBy', {})
+        requested_by = request.get('requestedBy') or {}
         return {
             'id': requested_by.get('id'),
             'display_name': requested_by.get('displayName', 'Unknown User'),
@@ -195,22 +312,20 @@ class AdminNotificationManager:
             requester_display = f"@{requester['username']}" if requester['username'] else requester['display_name']
             
             # Format timestamp
-            time_text = self.format_request_time(request_info['requested_at'])
+            time_text = self.format_request_time(request_info.get('requested_at_dt'))
             
             # Build message
-            message_lines = [
-                "🔔 **New Request Notification**",
-                f"👤 {requester_display} has requested:",
-                "",
-                f"{media_emoji} **{request_info['title']} ({request_info['year']})** - {genres_text}",
-                f"📝 {request_info['overview'][:150]}{'...' if len(request_info['overview']) > 150 else ''}",
-                f"💿 Quality: {request_info['quality']}",
-                f"📅 Requested: {time_text}",
-                "",
-                "Choose an action:"
-            ]
-            
-            message_text = '\n'.join(message_lines)
+            overview = request_info['overview']
+            message_text = _MESSAGE_TEMPLATE.format(
+                requester=html.escape(requester_display),
+                emoji=media_emoji,
+                title=html.escape(str(request_info['title'])),
+                year=html.escape(str(request_info['year'])),
+                genres=html.escape(genres_text),
+                overview=html.escape(f"{overview[:150]}{'...' if len(overview) > 150 else ''}"),
+                quality=request_info['quality'],
+                time=time_text
+            )
             
             # Create inline keyboard
             keyboard = [
@@ -220,10 +335,7 @@ class AdminNotificationManager:
                     InlineKeyboardButton("❌ Quick Reject", 
                                        callback_data=f"admin_reject_{request_info['request_id']}")
                 ],
-                [
-                    InlineKeyboardButton("📋 View All Pending", 
-                                       callback_data="admin_pending_all")
-                ]
+                _VIEW_ALL_ROW
             ]
             
             inline_keyboard = InlineKeyboardMarkup(keyboard)
@@ -236,22 +348,23 @@ class AdminNotificationManager:
     
     def get_media_emoji(self, media_type: str) -> str:
         """Get appropriate emoji for media type."""
-        emoji_map = {
-            'movie': '🎬',
-            'tv': '📺', 
-            'anime': '🌸',
-            'unknown': '📽️'
-        }
-        return emoji_map.get(media_type.lower(), '📽️')
+        return _EMOJI_MAP.get(media_type.lower(), '📽️')
+    
+    def parse_request_time(self, created_at: Optional[str]) -> Optional[datetime]:
+        """Parse an Overseerr ISO timestamp, returning None if missing or invalid."""
+        if not created_at:
+            return None
+        try:
+            return datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        except (TypeError, ValueError):
+            return None
     
-    def format_request_time(self, created_at: str) -> str:
-        """Format request timestamp for display."""
+    def format_request_time(self, request_time: Optional[datetime]) -> str:
+        """Format a parsed request timestamp for display."""
         try:
-            if not created_at:
+            if not request_time:
                 return "Unknown time"
             
-            # Parse ISO timestamp
-            request_time = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
             now = datetime.now(request_time.tzinfo)
             
             # Calculate time difference
@@ -282,27 +395,33 @@ class AdminNotificationManager:
             message_text: Formatted notification message
             inline_keyboard: Inline keyboard with action buttons
         """
+        # Send to all admins concurrently; one failure must not block the others
+        semaphore = asyncio.Semaphore(self.max_concurrent_sends)
+        tasks = []
+        for admin_user in admin_users:
+            logger.info("Sending admin notification to user %s (%s)", admin_user['user_id'], admin_user['username'])
+            tasks.append(self._send_limited(semaphore, admin_user['chat_id'], message_text, inline_keyboard))
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
         successful_sends = 0
         failed_sends = 0
-        
-        for admin_user in admin_users:
-            try:
-                chat_id = admin_user['chat_id']
-                logger.info(f"Sending admin notification to user {admin_user['user_id']} ({admin_user['username']})")
-                
-                # Send message using existing utility
-                await send_message(
-                    self.bot,
-                    chat_id,
-                    message_text,
-                    reply_markup=inline_keyboard,
-                    parse_mode='Markdown'
-                )
-                
-                successful_sends += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to send notification to admin {admin_user['user_id']}: {e}")
+        for admin_user, result in zip(admin_users, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send notification to admin {admin_user['user_id']}: {result}")
                 failed_sends += 1
+            else:
+                successful_sends += 1
         
         logger.info(f"Admin notifications sent: {successful_sends} successful, {failed_sends} failed")
+    
+    async def _send_limited(self, semaphore: asyncio.Semaphore, chat_id: int, message_text: str,
+                            inline_keyboard: Optional[InlineKeyboardMarkup]):
+        """Send one admin notification within the concurrency cap and shared rate limit."""
+        async with semaphore, _SEND_LIMITER:
+            return await self.bot.send_message(
+                chat_id=chat_id,
+                text=message_text,
+                reply_markup=inline_keyboard,
+                parse_mode='HTML'
+            )
@@ -1,138 +1,139 @@
-"""
-Notification management for Overseerr integration.
-"""
-import logging
-import requests
-from typing import Dict, Optional
-
-from config.constants import OVERSEERR_API_URL, OVERSEERR_API_KEY, TELEGRAM_TOKEN
-
-logger = logging.getLogger(__name__)
-
-def get_global_telegram_notifications():
-    """
-    Retrieves the current global Telegram notification settings from Overseerr.
-    Returns a dictionary with the settings or None on error.
-    """
-    try:
-        url = f"{OVERSEERR_API_URL}/settings/notifications/telegram"
-        headers = {
-            "X-Api-Key": OVERSEERR_API_KEY
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        settings = response.json()
-        logger.info(f"Current Global Telegram notification settings: {settings}")
-        return settings
-    except requests.RequestException as e:
-        logger.error(f"Error when retrieving Telegram notification settings: {e}")
-        return None
-
-async def set_global_telegram_notifications(update, context):
-    """
-    Activates the global Telegram notifications in Overseerr.
-    Returns True if successful, otherwise False.
-    """
-
-    bot_info = await context.bot.get_me()
-    chat_id = str(update.effective_chat.id)
-
-    payload = {
-        "enabled": True,
-        "types": 2047,  # Enable all notification types (bitmask for all types)
-        "options": {
-            "botUsername": bot_info.username,  # Botname
-            "botAPI": TELEGRAM_TOKEN,          # Telegram Token
-            "chatId": chat_id,                 # Chat-ID - i guess the admin will use the bot first?
-            "sendSilently": False              # Don't send silently so users see notifications
-        }
-    }
-    try:
-        url = f"{OVERSEERR_API_URL}/settings/notifications/telegram"
-        headers = {
-            "Content-Type": "application/json",
-            "X-Api-Key": OVERSEERR_API_KEY
-        }
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        response.raise_for_status()
-        logger.info("Global Telegram notifications have been successfully activated.")
-        return True
-    except requests.RequestException as e:
-        logger.error(f"Error when activating global Telegram notifications: {e}")
-        if e.response is not None:
-            logger.error(f"Response content: {e.response.text}")
-        return False
-
-async def enable_global_telegram_notifications(update, context):
-    """
-    Activates global Telegram notifications
-    """
-    GLOBAL_TELEGRAM_NOTIFICATION_STATUS = get_global_telegram_notifications()
-    if GLOBAL_TELEGRAM_NOTIFICATION_STATUS:
-        enabled = GLOBAL_TELEGRAM_NOTIFICATION_STATUS.get("enabled", False)
-        if enabled:
-            logger.info("Global Telegram notifications are activated.")
-        else:
-            logger.info("Activate global Telegram notifications...")
-            await set_global_telegram_notifications(update, context)
-    else:
-        logger.error("Could not retrieve Global Telegram notification settings.")
-
-def get_user_notification_settings(overseerr_user_id: int) -> Dict:
-    """
-    Retrieves the current notification settings for a specific Overseerr user.
-    Returns a dictionary with the settings or an empty dict on error.
-    """
-    try:
-        url = f"{OVERSEERR_API_URL}/user/{overseerr_user_id}/settings/notifications"
-        headers = {
-            "X-Api-Key": OVERSEERR_API_KEY
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        settings = response.json()
-        logger.info(f"User {overseerr_user_id} notification settings: {settings}")
-        return settings
-    except requests.RequestException as e:
-        logger.error(f"Error when retrieving notification settings for user {overseerr_user_id}: {e}")
-        return {}
-
-def update_telegram_settings_for_user(
-    overseerr_user_id: int,
-    telegram_enabled: bool,
-    telegram_bot_username: str,
-    telegram_bot_api: str,
-    telegram_chat_id: str,
-    telegram_send_silently: bool,
-    notification_types_bitmask: int = 0
-) -> bool:
-    """
-    Updates the Telegram notification settings for a specific Overseerr user.
-    Returns True if successful, otherwise False.
-    """
-    payload = {
-        "telegramEnabled": telegram_enabled,
-        "telegramBotUsername": telegram_bot_username,
-        "telegramBotAPI": telegram_bot_api,
-        "telegramChatId": telegram_chat_id,
-        "telegramSendSilently": telegram_send_silently,
-        "notificationTypes": {
-            "telegram": notification_types_bitmask
-        }
-    }
-
-    try:
-        url = f"{OVERSEERR_API_URL}/user/{overseerr_user_id}/settings/notifications"
-        headers = {
-            "Content-Type": "application/json",
-            "X-Api-Key": OVERSEERR_API_KEY
-        }
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        response.raise_for_status()
-        logger.info(f"Successfully updated Telegram notification settings for user {overseerr_user_id}.")
-        return True
-    except requests.RequestException as e:
-        logger.error(f"Error when updating Telegram notification settings for user {overseerr_user_id}: {e}")
-        if e.response is not None:
-            logger.error(f"Response content: {e.response.text}")
-        return False
+"""
+Notification management for Overseerr integration.
+"""
+import logging
+import time
+import httpx
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from api.overseerr_client import CLIENT
+from config.constants import TELEGRAM_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Recently fetched per-user notification settings: overseerr_user_id -> (fetched_at, settings)
+USER_SETTINGS_CACHE_MAX_SIZE = 256
+USER_SETTINGS_CACHE_TTL = 30.0
+_user_settings_cache: "OrderedDict[int, tuple[float, Dict]]" = OrderedDict()
+
+async def get_global_telegram_notifications():
+    """
+    Retrieves the current global Telegram notification settings from Overseerr.
+    Returns a dictionary with the settings or None on error.
+    """
+    try:
+        response = await CLIENT.get("/settings/notifications/telegram")
+        response.raise_for_status()
+        settings = response.json()
+        logger.info(f"Current Global Telegram notification settings: {settings}")
+        return settings
+    except (httpx.HTTPError, ValueError) as e:  # ValueError: non-JSON response body
+        logger.error(f"Error when retrieving Telegram notification settings: {e}")
+        return None
+
+async def set_global_telegram_notifications(update, context):
+    """
+    Activates the global Telegram notifications in Overseerr.
+    Returns True if successful, otherwise False.
+    """
+
+    bot_info = await context.bot.get_me()
+    chat_id = str(update.effective_chat.id)
+
+    payload = {
+        "enabled": True,
+        "types": 2047,  # Enable all notification types (bitmask for all types)
+        "options": {
+            "botUsername": bot_info.username,  # Botname
+            "botAPI": TELEGRAM_TOKEN,          # Telegram Token
+            "chatId": chat_id,                 # Chat-ID - i guess the admin will use the bot first?
+            "sendSilently": False              # Don't send silently so users see notifications
+        }
+    }
+    try:
+        response = await CLIENT.post("/settings/notifications/telegram", json=payload)
+        response.raise_for_status()
+        logger.info("Global Telegram notifications have been successfully activated.")
+        return True
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error(f"Error when activating global Telegram notifications: {e}")
+        if isinstance(e, httpx.HTTPStatusError):
+            logger.error(f"Response content: {e.response.text}")
+        return False
+
+async def enable_global_telegram_notifications(update, context):
+    """
+    Activates global Telegram notifications
+    """
+    GLOBAL_TELEGRAM_NOTIFICATION_STATUS = await get_global_telegram_notifications()
+    if GLOBAL_TELEGRAM_NOTIFICATION_STATUS:
+        enabled = GLOBAL_TELEGRAM_NOTIFICATION_STATUS.get("enabled", False)
+        if enabled:
+            logger.info("Global Telegram notifications are activated.")
+        else:
+            logger.info("Activate global Telegram notifications...")
+            await set_global_telegram_notifications(update, context)
+    else:
+        logger.error("Could not retrieve Global Telegram notification settings.")
+
+async def get_user_notification_settings(overseerr_user_id: int) -> Dict:
+    """
+    Retrieves the current notification settings for a specific Overseerr user.
+    Results are cached for USER_SETTINGS_CACHE_TTL seconds.
+    Returns a dictionary with the settings or an empty dict on error.
+    """
+    cached = _user_settings_cache.get(overseerr_user_id)
+    if cached and time.monotonic() - cached[0] < USER_SETTINGS_CACHE_TTL:
+        _user_settings_cache.move_to_end(overseerr_user_id)
+        return dict(cached[1])
+
+    try:
+        response = await CLIENT.get(f"/user/{overseerr_user_id}/settings/notifications")
+        response.raise_for_status()
+        settings = response.json()
+        logger.info(f"User {overseerr_user_id} notification settings: {settings}")
+        _user_settings_cache[overseerr_user_id] = (time.monotonic(), settings)
+        _user_settings_cache.move_to_end(overseerr_user_id)
+        if len(_user_settings_cache) > USER_SETTINGS_CACHE_MAX_SIZE:
+            _user_settings_cache.popitem(last=False)
+        return dict(settings)
+    except (httpx.HTTPError, ValueError) as e:  # ValueError: non-JSON response body
+        logger.error(f"Error when retrieving notification settings for user {overseerr_user_id}: {e}")
+        return {}
+
+async def update_telegram_settings_for_user(
+    overseerr_user_id: int,
+    telegram_enabled: bool,
+    telegram_bot_username: str,
+    telegram_bot_api: str,
+    telegram_chat_id: str,
+    telegram_send_silently: bool,
+    notification_types_bitmask: int = 0
+) -> bool:
+    """
+    Updates the Telegram notification settings for a specific Overseerr user.
+    Returns True if successful, otherwise False.
+    """
+    payload = {
+        "telegramEnabled": telegram_enabled,
+        "telegramBotUsername": telegram_bot_username,
+        "telegramBotAPI": telegram_bot_api,
+        "telegramChatId": telegram_chat_id,
+        "telegramSendSilently": telegram_send_silently,
+        "notificationTypes": {
+            "telegram": notification_types_bitmask
+        }
+    }
+
+    try:
+        response = await CLIENT.post(f"/user/{overseerr_user_id}/settings/notifications", json=payload)
+        response.raise_for_status()
+        _user_settings_cache.pop(overseerr_user_id, None)
+        logger.info(f"Successfully updated Telegram notification settings for user {overseerr_user_id}.")
+        return True
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error(f"Error when updating Telegram notification settings for user {overseerr_user_id}: {e}")
+        if isinstance(e, httpx.HTTPStatusError):
+            logger.error(f"Response content: {e.response.text}")
+        return False
@@ -1,184 +1,268 @@
-"""
-Polling-based notification system for Overseerr request status changes.
-"""
-import logging
-import asyncio
-import json
-import os
-from typing import Dict, List, Any
-from datetime import datetime
-
-from api.overseerr_api import get_user_requests, get_request_details
-from config.constants import CURRENT_MODE, BotMode
-
-logger = logging.getLogger(__name__)
-
-class RequestStatusMonitor:
-    def __init__(self, bot_instance):
-        """Initialize the request status monitor."""
-        self.bot = bot_instance
-        self.status_file = "data/request_status.json"
-        self.check_interval = 300  # 5 minutes
-        self.running = False
-        
-    def load_tracked_requests(self) -> Dict:
-        """Load tracked request statuses from file."""
-        try:
-            if os.path.exists(self.status_file):
-                with open(self.status_file, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading tracked requests: {e}")
-        return {}
-    
-    def save_tracked_requests(self, requests: Dict):
-        """Save tracked request statuses to file."""
-        try:
-            os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
-            with open(self.status_file, 'w') as f:
-                json.dump(requests, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving tracked requests: {e}")
-    
-    def track_request(self, request_id: int, chat_id: int, initial_status: str = "pending"):
-        """Start tracking a request for status changes."""
-        tracked_requests = self.load_tracked_requests()
-        
-        tracked_requests[str(request_id)] = {
-            "chat_id": chat_id,
-            "status": initial_status,
-            "tracked_since": datetime.now().isoformat(),
-            "last_checked": datetime.now().isoformat()
-        }
-        
-        self.save_tracked_requests(tracked_requests)
-        logger.info(f"Now tracking request {request_id} for chat {chat_id}")
-    
-    async def check_request_status_changes(self):
-        """Check all tracked requests for status changes."""
-        if CURRENT_MODE != BotMode.API:
-            logger.debug("Request monitoring only available in API mode")
-            return
-            
-        tracked_requests = self.load_tracked_requests()
-        if not tracked_requests:
-            return
-        
-        changes_made = False
-        
-        for request_id_str, request_info in tracked_requests.items():
-            try:
-                request_id = int(request_id_str)
-                chat_id = request_info["chat_id"]
-                old_status = request_info["status"]
-                
-                # Get current request details from Overseerr
-                request_details = await self.get_request_status(request_id)
-                if not request_details:
-                    continue
-                    
-                new_status = request_details.get("status", "unknown")
-                
-                # Check if status changed
-                if new_status != old_status:
-                    logger.info(f"Status change detected for request {request_id}: {old_status} -> {new_status}")
-                    
-                    # Send notification
-                    await self.send_status_notification(chat_id, request_details, old_status, new_status)
-                    
-                    # Update tracked status
-                    request_info["status"] = new_status
-                    request_info["last_checked"] = datetime.now().isoformat()
-                    changes_made = True
-                    
-                    # Remove from tracking if completed or declined
-                    if new_status in ["available", "declined"]:
-                        logger.info(f"Request {request_id} completed, removing from tracking")
-                        del tracked_requests[request_id_str]
-                        changes_made = True
-                else:
-                    # Just update last checked time
-                    request_info["last_checked"] = datetime.now().isoformat()
-                    changes_made = True
-                    
-            except Exception as e:
-                logger.error(f"Error checking status for request {request_id_str}: {e}")
-        
-        if changes_made:
-            self.save_tracked_requests(tracked_requests)
-    
-    async def get_request_status(self, request_id: int) -> Dict[str, Any]:
-        """Get request details from Overseerr API."""
-        try:
-            # This would need to be implemented in the overseerr_api.py
-            # For now, return None to indicate the feature needs API implementation
-            logger.debug(f"Would check status for request {request_id}")
-            return None
-        except Exception as e:
-            logger.error(f"Error getting request status for {request_id}: {e}")
-            return None
-    
-    async def send_status_notification(self, chat_id: int, request_details: Dict, old_status: str, new_status: str):
-        """Send status change notification to Telegram."""
-        try:
-            title = request_details.get("media", {}).get("title", "Unknown Title")
-            media_type = request_details.get("type", "unknown")
-            request_id = request_details.get("id", "N/A")
-            
-            # Format message based on new status
-            if new_status == "approved":
-                emoji = "✅"
-                message = f"**Request Approved**"
-                details = f"Your request has been approved and will be processed soon."
-            elif new_status == "declined":
-                emoji = "❌"
-                message = f"**Request Declined**" 
-                details = f"Your request has been declined."
-            elif new_status == "available":
-                emoji = "🎉"
-                message = f"**Media Available**"
-                details = f"Your requested media is now available for viewing!"
-            else:
-                emoji = "ℹ️"
-                message = f"**Status Update**"
-                details = f"Request status changed from {old_status} to {new_status}"
-            
-            media_emoji = "🎬" if media_type == "movie" else "📺"
-            
-            notification_text = f"""{emoji} {message}
-
-{media_emoji} **{title}**
-🆔 Request ID: #{request_id}
-
-{details}"""
-            
-            await self.bot.send_message(
-                chat_id=chat_id, 
-                text=notification_text, 
-                parse_mode='Markdown'
-            )
-            logger.info(f"Sent status notification to chat {chat_id}")
-            
-        except Exception as e:
-            logger.error(f"Error sending notification to chat {chat_id}: {e}")
-    
-    async def start_monitoring(self):
-        """Start the background monitoring loop."""
-        if self.running:
-            return
-            
-        self.running = True
-        logger.info(f"Starting request status monitoring (check interval: {self.check_interval}s)")
-        
-        while self.running:
-            try:
-                await self.check_request_status_changes()
-                await asyncio.sleep(self.check_interval)
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                await asyncio.sleep(60)  # Wait a minute before retrying
-    
-    def stop_monitoring(self):
-        """Stop the background monitoring."""
-        self.running = False
-        logger.info("Stopped request status monitoring")
+"""
+Polling-based notification system for Overseerr request status changes.
+"""
+import logging
+import asyncio
+import os
+from typing import Dict, List, Any
+from datetime import datetime
+
+from config.constants import CURRENT_MODE, BotMode
+from utils.json_utils import loads, dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+class RequestStatusMonitor:
+    def __init__(self, bot_instance):
+        """Initialize the request status monitor."""
+        self.bot = bot_instance
+        self.status_file = "data/request_status.json"
+        self.check_interval = 300  # 5 minutes
+        self.max_concurrent_checks = 10  # Parallel Overseerr lookups / Telegram sends per check
+        self.running = False
+        self._dir_ready = False
+        # Tracked requests live in memory and are flushed to status_file in the background
+        self.flush_interval = 30
+        self._tracked = self.load_tracked_requests()
+        self._dirty = False
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+        self._stop_event = asyncio.Event()
+        
+    def load_tracked_requests(self) -> Dict:
+        """Load tracked request statuses from file."""
+        try:
+            if os.path.exists(self.status_file):
+                with open(self.status_file, 'rb') as f:
+                    return loads(f.read())
+        except Exception as e:
+            logger.error(f"Error loading tracked requests: {e}")
+        return {}
+    
+    def save_tracked_requests(self, requests: Dict) -> bool:
+        """Save tracked request statuses to file. Returns True if the file was written."""
+        try:
+            if not self._dir_ready:
+                os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+                self._dir_ready = True
+            # Write to a temp file and swap it in so a crash never leaves a truncated file
+            tmp_file = self.status_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(dumps_bytes(requests))
+            os.replace(tmp_file, self.status_file)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving tracked requests: {e}")
+            return False
+    
+    def track_request(self, request_id: int, chat_id: int, initial_status: str = "pending"):
+        """Start tracking a request for status changes."""
+        now_iso = datetime.now().isoformat()
+        
+        self._tracked[str(request_id)] = {
+            "chat_id": chat_id,
+            "status": initial_status,
+            "tracked_since": now_iso,
+            "last_checked": now_iso
+        }
+        
+        self._dirty = True
+        logger.info(f"Now tracking request {request_id} for chat {chat_id}")
+    
+    async def check_request_status_changes(self):
+        """Check all tracked requests for status changes."""
+        if CURRENT_MODE != BotMode.API:
+            logger.debug("Request monitoring only available in API mode")
+            return
+            
+        tracked_requests = self._tracked
+        if not tracked_requests:
+            return
+        
+        current = await self._batch_fetch_statuses(list(tracked_requests.keys()))
+        
+        # Only requests whose status moved need any further work
+        changed = {
+            request_id_str: request_details
+            for request_id_str, request_details in current.items()
+            if request_details.get("status", "unknown") != tracked_requests[request_id_str]["status"]
+        }
+        if not changed:
+            return
+        
+        now_iso = datetime.now().isoformat()
+        notifications = []
+        
+        for request_id_str, request_details in changed.items():
+            try:
+                request_info = tracked_requests[request_id_str]
+                request_id = int(request_id_str)
+                chat_id = request_info["chat_id"]
+                old_status = request_info["status"]
+                new_status = request_details.get("status", "unknown")
+                
+                logger.info("Status change detected for request %s: %s -> %s", request_id, old_status, new_status)
+                
+                # Queue the notification; all of them are sent concurrently below
+                notifications.append((chat_id, request_details, old_status, new_status))
+                
+                # Update tracked status
+                request_info["status"] = new_status
+                request_info["last_checked"] = now_iso
+                
+                # Remove from tracking if completed or declined
+                if new_status in ["available", "declined"]:
+                    logger.info(f"Request {request_id} completed, removing from tracking")
+                    del tracked_requests[request_id_str]
+                    
+            except Exception as e:
+                logger.error(f"Error checking status for request {request_id_str}: {e}")
+        
+        self._dirty = True
+        
+        # Each message goes to a different chat, so one slow send shouldn't hold up the rest
+        semaphore = asyncio.Semaphore(self.max_concurrent_checks)
+        await asyncio.gather(
+            *(self._send_status_notification_limited(semaphore, *args) for args in notifications)
+        )
+    
+    async def flush(self):
+        """Write tracked requests to disk if they changed since the last flush."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            # Stay dirty if the write fails so the next flush retries it
+            if self.save_tracked_requests(self._tracked):
+                self._dirty = False
+    
+    async def _flush_loop(self):
+        """Periodically persist tracked request changes while monitoring is running."""
+        while self.running:
+            if await self._wait_for_stop(self.flush_interval):
+                break
+            await self.flush()
+    
+    async def _wait_for_stop(self, timeout: float) -> bool:
+        """Sleep for up to timeout seconds; return True early if monitoring was stopped."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _batch_fetch_statuses(self, request_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch current details for the given request IDs.
+        Requests that could not be fetched are left out of the result.
+        """
+        # Overseerr has no batch lookup, so query concurrently, bounded by a semaphore
+        semaphore = asyncio.Semaphore(self.max_concurrent_checks)
+        results = await asyncio.gather(
+            *(self._fetch_request_status(semaphore, request_id_str) for request_id_str in request_ids),
+            return_exceptions=True
+        )
+        
+        current = {}
+        for request_id_str, request_details in zip(request_ids, results):
+            if isinstance(request_details, Exception):
+                logger.error(f"Error checking status for request {request_id_str}: {request_details}")
+            elif request_details:
+                current[request_id_str] = request_details
+        return current
+    
+    async def _fetch_request_status(self, semaphore: asyncio.Semaphore, request_id_str: str) -> Dict[str, Any]:
+        """Fetch a single request's details while holding the concurrency semaphore."""
+        async with semaphore:
+            return await self.get_request_status(int(request_id_str))
+    
+    async def get_request_status(self, request_id: int) -> Dict[str, Any]:
+        """Get request details from Overseerr API."""
+        try:
+            # This would need to be implemented in the overseerr_api.py
+            # For now, return None to indicate the feature needs API implementation
+            logger.debug("Would check status for request %s", request_id)
+            return None
+        except Exception as e:
+            logger.error(f"Error getting request status for {request_id}: {e}")
+            return None
+    
+    async def _send_status_notification_limited(self, semaphore: asyncio.Semaphore, chat_id: int,
+                                                request_details: Dict, old_status: str, new_status: str):
+        """Send a single status notification while holding the concurrency semaphore."""
+        async with semaphore:
+            await self.send_status_notification(chat_id, request_details, old_status, new_status)
+    
+    async def send_status_notification(self, chat_id: int, request_details: Dict, old_status: str, new_status: str):
+        """Send status change notification to Telegram."""
+        try:
+            title = request_details.get("media", {}).get("title", "Unknown Title")
+            media_type = request_details.get("type", "unknown")
+            request_id = request_details.get("id", "N/A")
+            
+            # Format message based on new status
+            if new_status == "approved":
+                emoji = "✅"
+                message = f"**Request Approved**"
+                details = f"Your request has been approved and will be processed soon."
+            elif new_status == "declined":
+                emoji = "❌"
+                message = f"**Request Declined**" 
+                details = f"Your request has been declined."
+            elif new_status == "available":
+                emoji = "🎉"
+                message = f"**Media Available**"
+                details = f"Your requested media is now available for viewing!"
+            else:
+                emoji = "ℹ️"
+                message = f"**Status Update**"
+                details = f"Request status changed from {old_status} to {new_status}"
+            
+            media_emoji = "🎬" if media_type == "movie" else "📺"
+            
+            notification_text = f"""{emoji} {message}
+
+{media_emoji} **{title}**
+🆔 Request ID: #{request_id}
+
+{details}"""
+            
+            await self.bot.send_message(
+                chat_id=chat_id, 
+                text=notification_text, 
+                parse_mode='Markdown'
+            )
+            logger.info("Sent status notification to chat %s", chat_id)
+            
+        except Exception as e:
+            logger.error(f"Error sending notification to chat {chat_id}: {e}")
+    
+    async def start_monitoring(self):
+        """Start the background monitoring loop."""
+        if self.running:
+            return
+            
+        self.running = True
+        self._stop_event.clear()
+        logger.info(f"Starting request status monitoring (check interval: {self.check_interval}s)")
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        
+        while self.running:
+            try:
+                await self.check_request_status_changes()
+                if await self._wait_for_stop(self.check_interval):
+                    break
+            except Exception as e:
+                logger.error(f"Error in monitoring loop: {e}")
+                if await self._wait_for_stop(60):  # Wait a minute before retrying
+                    break
+    
+    def stop_monitoring(self):
+        """Stop the background monitoring."""
+        self.running = False
+        self._stop_event.set()
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._dirty and self.save_tracked_requests(self._tracked):
+            self._dirty = False
+        logger.info("Stopped request status monitoring")
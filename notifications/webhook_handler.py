@@ -1,222 +1,382 @@
-"""
-Lightweight webhook handler for receiving Overseerr notifications.
-"""
-import logging
-import json
-import asyncio
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from threading import Thread
-from typing import Dict, Any
-from urllib.parse import urlparse
-
-logger = logging.getLogger(__name__)
-
-class WebhookHandler:
-    def __init__(self, bot_instance):
-        """Initialize webhook handler with bot instance."""
-        self.bot = bot_instance
-        self.server = None
-        self.server_thread = None
-        # Initialize admin notification manager
-        from .admin_notifications import AdminNotificationManager
-        self.admin_notifier = AdminNotificationManager(bot_instance)
-        
-    def create_request_handler(self):
-        """Create request handler class with bot instance."""
-        bot = self.bot
-        admin_notifier = self.admin_notifier
-        
-        class OverseerrWebhookHandler(BaseHTTPRequestHandler):
-            def log_message(self, format, *args):
-                """Override to use our logger instead of stdout."""
-                logger.info(format % args)
-                
-            def do_GET(self):
-                """Handle GET requests (health check)."""
-                parsed_path = urlparse(self.path)
-                
-                if parsed_path.path == '/webhook/health':
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/json')
-                    self.end_headers()
-                    response = json.dumps({"status": "healthy"})
-                    self.wfile.write(response.encode())
-                else:
-                    self.send_response(404)
-                    self.end_headers()
-                    
-            def do_POST(self):
-                """Handle POST requests (webhook notifications)."""
-                parsed_path = urlparse(self.path)
-                
-                if parsed_path.path == '/webhook/overseerr':
-                    try:
-                        # Read request body
-                        content_length = int(self.headers.get('Content-Length', 0))
-                        post_data = self.rfile.read(content_length)
-                        
-                        # Parse JSON
-                        webhook_data = json.loads(post_data.decode('utf-8'))
-                        logger.info(f"Received Overseerr webhook: {json.dumps(webhook_data, indent=2)}")
-                        
-                        # Process webhook in background
-                        asyncio.create_task(self.process_webhook(webhook_data))
-                        
-                        # Return success response
-                        self.send_response(200)
-                        self.send_header('Content-type', 'application/json')
-                        self.end_headers()
-                        response = json.dumps({"status": "success"})
-                        self.wfile.write(response.encode())
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing webhook: {e}")
-                        self.send_response(500)
-                        self.send_header('Content-type', 'application/json')
-                        self.end_headers()
-                        response = json.dumps({"error": "Internal server error"})
-                        self.wfile.write(response.encode())
-                else:
-                    self.send_response(404)
-                    self.end_headers()
-                    
-            async def process_webhook(self, webhook_data: Dict[str, Any]):
-                """Process webhook data and send Telegram notification."""
-                try:
-                    notification_type = webhook_data.get('notification_type', 'unknown')
-                    subject = webhook_data.get('subject', 'Unknown')
-                    message = webhook_data.get('message', '')
-                    media = webhook_data.get('media', {})
-                    request_data = webhook_data.get('request', {})
-                    
-                    # NEW: Process admin notifications for new requests
-                    await admin_notifier.process_new_request_webhook(webhook_data)
-                    
-                    # Extract media information
-                    media_type = media.get('media_type', 'unknown')
-                    title = subject  # Use subject as title fallback
-                    
-                    # Extract request information
-                    requested_by = request_data.get('requestedBy', {}).get('displayName', 'Unknown User')
-                    request_id = request_data.get('id', 'N/A')
-                    
-                    # Format notification message
-                    telegram_message = self.format_notification_message(
-                        notification_type, subject, message, title, media_type, 
-                        requested_by, request_id
-                    )
-                    
-                    # Send to Telegram
-                    await self.send_to_telegram(telegram_message, webhook_data)
-                    
-                except Exception as e:
-                    logger.error(f"Error in webhook processing: {e}")
-                    
-            def format_notification_message(self, notification_type: str, subject: str, message: str, 
-                                          title: str, media_type: str, requested_by: str, 
-                                          request_id: str) -> str:
-                """Format notification message for Telegram."""
-                
-                # Media type emoji
-                media_emoji = "🎬" if media_type == "movie" else "📺" if media_type == "tv" else "📽️"
-                
-                # Notification type specific formatting
-                if notification_type == 'MEDIA_APPROVED':
-                    status_emoji = "✅"
-                    status_text = "**Request Approved**"
-                    action = f"Your request has been approved and will be processed soon."
-                    
-                elif notification_type == 'MEDIA_DECLINED':
-                    status_emoji = "❌" 
-                    status_text = "**Request Declined**"
-                    action = f"Your request has been declined."
-                    
-                elif notification_type == 'MEDIA_AUTO_APPROVED':
-                    status_emoji = "🤖"
-                    status_text = "**Request Auto-Approved**"
-                    action = f"Your request has been automatically approved and will be processed soon."
-                    
-                elif notification_type == 'MEDIA_AVAILABLE':
-                    status_emoji = "🎉"
-                    status_text = "**Media Available**"
-                    action = f"Your requested media is now available for viewing!"
-                    
-                elif notification_type == 'MEDIA_FAILED':
-                    status_emoji = "⚠️"
-                    status_text = "**Processing Failed**"
-                    action = f"Failed to process your request. Please check the system."
-                    
-                else:
-                    status_emoji = "ℹ️"
-                    status_text = f"**{notification_type.replace('_', ' ').title()}**"
-                    action = message or f"Update for your request"
-                
-                # Build the message
-                formatted_message = f"""{status_emoji} {status_text}
-
-{media_emoji} **{title}**
-👤 Requested by: {requested_by}
-🆔 Request ID: #{request_id}
-
-{action}"""
-
-                if message and message != action:
-                    formatted_message += f"\n\n💬 {message}"
-                    
-                return formatted_message
-                
-            async def send_to_telegram(self, message: str, webhook_data: Dict[str, Any]):
-                """Send notification to Telegram."""
-                try:
-                    # Try to extract chat ID from webhook data
-                    chat_id = None
-                    
-                    # Check various possible locations for chat ID
-                    notification_agent = webhook_data.get('notificationAgent', {})
-                    if notification_agent:
-                        options = notification_agent.get('options', {})
-                        chat_id = options.get('chatId') or options.get('chat_id')
-                    
-                    # If no chat ID in webhook, you might want to use a default
-                    # or get it from your bot configuration
-                    if not chat_id:
-                        logger.warning("No chat ID found in webhook data, notification not sent")
-                        return
-                        
-                    # Send message
-                    await bot.send_message(
-                        chat_id=chat_id, 
-                        text=message, 
-                        parse_mode='Markdown'
-                    )
-                    logger.info(f"Notification sent to chat {chat_id}")
-                    
-                except Exception as e:
-                    logger.error(f"Error sending Telegram notification: {e}")
-                    
-        return OverseerrWebhookHandler
-    
-    def start_webhook_server(self, host='0.0.0.0', port=8080):
-        """Start the webhook server in a separate thread."""
-        def run_server():
-            try:
-                handler_class = self.create_request_handler()
-                self.server = HTTPServer((host, port), handler_class)
-                logger.info(f"Starting webhook server on {host}:{port}")
-                logger.info(f"Webhook URL: http://{host}:{port}/webhook/overseerr")
-                logger.info(f"Health check: http://{host}:{port}/webhook/health")
-                self.server.serve_forever()
-            except Exception as e:
-                logger.error(f"Webhook server error: {e}")
-        
-        self.server_thread = Thread(target=run_server, daemon=True)
-        self.server_thread.start()
-        logger.info("Webhook server started in background thread")
-        
-        return self.server_thread
-    
-    def stop_webhook_server(self):
-        """Stop the webhook server."""
-        if self.server:
-            self.server.shutdown()
-            logger.info("Webhook server stopped")
+"""
+Lightweight webhook handler for receiving Overseerr notifications.
+"""
+import logging
+import asyncio
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from typing import Dict, Any, Final, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from utils.json_utils import loads, dumps
+from utils.health_check import health_checker
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1 << 20  # 1 MiB
+
+# Constant response bodies
+_HEALTHY = b'{"status":"healthy"}'
+_UNHEALTHY = b'{"status":"unhealthy"}'
+_SUCCESS = b'{"status":"success"}'
+_ERROR_500 = b'{"error":"Internal server error"}'
+
+def _build_response(code: int, body: bytes) -> bytes:
+    """Pre-render a complete HTTP response (status line, headers and body)."""
+    status = HTTPStatus(code)
+    return (
+        b"HTTP/1.0 %d %s\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: %d\r\n"
+        b"Connection: close\r\n"
+        b"\r\n" % (status.value, status.phrase.encode("latin-1"), len(body))
+    ) + body
+
+# (status code, body) -> full response bytes, written with a single call
+_RESPONSES = {
+    (200, _HEALTHY): _build_response(200, _HEALTHY),
+    (503, _UNHEALTHY): _build_response(503, _UNHEALTHY),
+    (200, _SUCCESS): _build_response(200, _SUCCESS),
+    (500, _ERROR_500): _build_response(500, _ERROR_500),
+}
+
+EMOJI_MOVIE: Final = "🎬"
+EMOJI_TV: Final = "📺"
+EMOJI_FILM: Final = "📽️"
+EMOJI_APPROVED: Final = "✅"
+EMOJI_DECLINED: Final = "❌"
+EMOJI_AUTO_APPROVED: Final = "🤖"
+EMOJI_AVAILABLE: Final = "🎉"
+EMOJI_FAILED: Final = "⚠️"
+EMOJI_INFO: Final = "ℹ️"
+
+_MEDIA_EMOJI = {"movie": EMOJI_MOVIE, "tv": EMOJI_TV}
+
+# notification_type -> (status emoji, status text, action line)
+_NOTIF_TABLE = {
+    'MEDIA_APPROVED': (EMOJI_APPROVED, "**Request Approved**",
+                       "Your request has been approved and will be processed soon."),
+    'MEDIA_DECLINED': (EMOJI_DECLINED, "**Request Declined**",
+                       "Your request has been declined."),
+    'MEDIA_AUTO_APPROVED': (EMOJI_AUTO_APPROVED, "**Request Auto-Approved**",
+                            "Your request has been automatically approved and will be processed soon."),
+    'MEDIA_AVAILABLE': (EMOJI_AVAILABLE, "**Media Available**",
+                        "Your requested media is now available for viewing!"),
+    'MEDIA_FAILED': (EMOJI_FAILED, "**Processing Failed**",
+                     "Failed to process your request. Please check the system."),
+}
+
+_MSG_TEMPLATE = (
+    "{status_emoji} {status_text}\n"
+    "\n"
+    "{media_emoji} **{title}**\n"
+    "👤 Requested by: {requested_by}\n"
+    "🆔 Request ID: #{request_id}\n"
+    "\n"
+    "{action}"
+)
+_EXTRA_TEMPLATE = "\n\n💬 {message}"
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    """HTTP server that handles requests on a fixed pool of worker threads."""
+    
+    def __init__(self, server_address, handler_class, workers: int = 16):
+        super().__init__(server_address, handler_class)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webhook")
+    
+    def process_request(self, request, client_address):
+        self._pool.submit(self.process_request_thread, request, client_address)
+    
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+class NotificationFields(NamedTuple):
+    """Fields of an Overseerr webhook used in the user-facing notification."""
+    notification_type: str
+    subject: str
+    message: str
+    title: str
+    media_type: str
+    requested_by: str
+    request_id: str
+
+
+def extract_notification_fields(webhook_data: Dict[str, Any]) -> NotificationFields:
+    """Pull the notification fields out of a webhook payload in a single pass."""
+    media = webhook_data.get('media') or {}
+    request_data = webhook_data.get('request') or {}
+    requested_by = request_data.get('requestedBy') or {}
+    subject = webhook_data.get('subject', 'Unknown')
+    return NotificationFields(
+        notification_type=webhook_data.get('notification_type', 'unknown'),
+        subject=subject,
+        message=webhook_data.get('message', ''),
+        title=subject,  # Use subject as title fallback
+        media_type=media.get('media_type', 'unknown'),
+        requested_by=requested_by.get('displayName', 'Unknown User'),
+        request_id=request_data.get('id', 'N/A')
+    )
+
+
+# Recently processed webhooks, so Overseerr retries don't notify twice
+_SEEN_MAX_SIZE = 4096
+_SEEN_TTL = 300  # seconds
+_seen_webhooks: "OrderedDict[tuple, float]" = OrderedDict()
+
+def is_duplicate_webhook(webhook_data: Dict[str, Any]) -> bool:
+    """
+    Record a webhook and report whether the same event was already handled recently.
+    Payloads without a request id (test notifications, issues) can't be told apart
+    reliably, so they are never treated as duplicates.
+    """
+    request_data = webhook_data.get('request') or {}
+    request_id = request_data.get('id')
+    if request_id is None:
+        return False
+    media = webhook_data.get('media') or {}
+    key = (webhook_data.get('notification_type'), request_id, media.get('id'))
+    now = time.monotonic()
+    
+    seen_at = _seen_webhooks.get(key)
+    if seen_at is not None and now - seen_at < _SEEN_TTL:
+        return True
+    
+    _seen_webhooks[key] = now
+    _seen_webhooks.move_to_end(key)
+    if len(_seen_webhooks) > _SEEN_MAX_SIZE:
+        _seen_webhooks.popitem(last=False)
+    return False
+
+class _LazyJson:
+    """Pretty-prints a payload only if the log record that holds it is actually emitted."""
+    __slots__ = ("data",)
+    
+    def __init__(self, data):
+        self.data = data
+    
+    def __str__(self):
+        return dumps(self.data, indent=True)
+
+class WebhookHandler:
+    def __init__(self, bot_instance):
+        """Initialize webhook handler with bot instance."""
+        self.bot = bot_instance
+        self.server = None
+        self.server_thread = None
+        self.loop = None  # Bot's event loop; webhook processing is scheduled onto it
+        # Initialize admin notification manager
+        from .admin_notifications import AdminNotificationManager
+        self.admin_notifier = AdminNotificationManager(bot_instance)
+        
+    def create_request_handler(self):
+        """Create request handler class with bot instance."""
+        bot = self.bot
+        admin_notifier = self.admin_notifier
+        loop = self.loop
+        
+        class OverseerrWebhookHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                """Override to use our logger instead of stdout."""
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(format, *args)
+            
+            def log_request(self, code='-', size='-'):
+                """Only log failed requests; successful webhooks are already logged in do_POST."""
+                if isinstance(code, HTTPStatus):
+                    code = code.value
+                if isinstance(code, int) and code >= 400:
+                    self.log_message('"%s" %s %s', self.requestline, str(code), str(size))
+                
+            def send_json(self, code: int, body: bytes):
+                """Send one of the pre-rendered JSON responses in a single write."""
+                self.log_request(code)
+                self.close_connection = True
+                self.wfile.write(_RESPONSES[(code, body)])
+                
+            def do_GET(self):
+                """Handle GET requests (health check)."""
+                parsed_path = urlparse(self.path)
+                
+                if parsed_path.path == '/webhook/health':
+                    self.send_json(200, _HEALTHY)
+                elif parsed_path.path == '/healthz':
+                    # Bot liveness from the in-memory heartbeat; no disk access
+                    if health_checker.is_healthy():
+                        self.send_json(200, _HEALTHY)
+                    else:
+                        self.send_json(503, _UNHEALTHY)
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    
+            def do_POST(self):
+                """Handle POST requests (webhook notifications)."""
+                parsed_path = urlparse(self.path)
+                
+                if parsed_path.path == '/webhook/overseerr':
+                    # Overseerr webhooks are a few KB; refuse anything that could exhaust memory
+                    try:
+                        content_length = int(self.headers.get('Content-Length', 0))
+                    except ValueError:
+                        self.send_response(400)
+                        self.end_headers()
+                        return
+                    if content_length < 0 or content_length > MAX_BODY_SIZE:
+                        logger.warning(f"Rejected webhook with Content-Length {content_length}")
+                        self.send_response(413)
+                        self.end_headers()
+                        return
+                    
+                    try:
+                        # Read request body into a buffer of the announced size
+                        buf = bytearray(content_length)
+                        view = memoryview(buf)
+                        received = 0
+                        while received < content_length:
+                            n = self.rfile.readinto(view[received:])
+                            if not n:
+                                break
+                            received += n
+                        post_data = bytes(view[:received])
+                        
+                        # Parse JSON
+                        webhook_data = loads(post_data)
+                        logger.info("Received Overseerr webhook: %s", _LazyJson(webhook_data))
+                        
+                        # Process webhook in background on the bot's event loop; this
+                        # handler runs on the server thread, which has no loop of its own
+                        asyncio.run_coroutine_threadsafe(self.process_webhook(webhook_data), loop)
+                        
+                        # Return success response
+                        self.send_json(200, _SUCCESS)
+                        
+                    except Exception as e:
+                        logger.error(f"Error processing webhook: {e}")
+                        self.send_json(500, _ERROR_500)
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    
+            async def process_webhook(self, webhook_data: Dict[str, Any]):
+                """Process webhook data and send Telegram notification."""
+                try:
+                    if is_duplicate_webhook(webhook_data):
+                        logger.info("Skipping duplicate %s webhook for request %s",
+                                    webhook_data.get('notification_type'),
+                                    (webhook_data.get('request') or {}).get('id'))
+                        return
+                    
+                    # NEW: Process admin notifications for new requests
+                    await admin_notifier.process_new_request_webhook(webhook_data)
+                    
+                    # Format notification message
+                    fields = extract_notification_fields(webhook_data)
+                    telegram_message = self.format_notification_message(**fields._asdict())
+                    
+                    # Send to Telegram
+                    await self.send_to_telegram(telegram_message, webhook_data)
+                    
+                except Exception as e:
+                    logger.error(f"Error in webhook processing: {e}")
+                    
+            def format_notification_message(self, notification_type: str, subject: str, message: str, 
+                                          title: str, media_type: str, requested_by: str, 
+                                          request_id: str) -> str:
+                """Format notification message for Telegram."""
+                
+                # Media type emoji
+                media_emoji = _MEDIA_EMOJI.get(media_type, EMOJI_FILM)
+                
+                # Notification type specific formatting
+                entry = _NOTIF_TABLE.get(notification_type)
+                if entry:
+                    status_emoji, status_text, action = entry
+                else:
+                    status_emoji = EMOJI_INFO
+                    status_text = f"**{notification_type.replace('_', ' ').title()}**"
+                    action = message or "Update for your request"
+                
+                # Build the message
+                formatted_message = _MSG_TEMPLATE.format(
+                    status_emoji=status_emoji,
+                    status_text=status_text,
+                    media_emoji=media_emoji,
+                    title=title,
+                    requested_by=requested_by,
+                    request_id=request_id,
+                    action=action
+                )
+
+                if message and message != action:
+                    formatted_message += _EXTRA_TEMPLATE.format(message=message)
+                    
+                return formatted_message
+                
+            async def send_to_telegram(self, message: str, webhook_data: Dict[str, Any]):
+                """Send notification to Telegram."""
+                try:
+                    # Try to extract chat ID from webhook data
+                    chat_id = None
+                    
+                    # Check various possible locations for chat ID
+                    notification_agent = webhook_data.get('notificationAgent') or {}
+                    if notification_agent:
+                        options = notification_agent.get('options') or {}
+                        chat_id = options.get('chatId') or options.get('chat_id')
+                    
+                    # If no chat ID in webhook, you might want to use a default
+                    # or get it from your bot configuration
+                    if not chat_id:
+                        logger.warning("No chat ID found in webhook data, notification not sent")
+                        return
+                        
+                    # Send message
+                    await bot.send_message(
+                        chat_id=chat_id, 
+                        text=message, 
+                        parse_mode='Markdown'
+                    )
+                    logger.info(f"Notification sent to chat {chat_id}")
+                    
+                except Exception as e:
+                    logger.error(f"Error sending Telegram notification: {e}")
+                    
+        return OverseerrWebhookHandler
+    
+    def start_webhook_server(self, host='0.0.0.0', port=8080,
+                             loop: Optional[asyncio.AbstractEventLoop] = None, workers: int = 16):
+        """
+        Start the webhook server in a separate thread.
+        Must be called from the bot's running event loop (e.g. post_init) unless
+        that loop is passed in explicitly.
+        """
+        self.loop = loop or asyncio.get_running_loop()
+        
+        def run_server():
+            try:
+                handler_class = self.create_request_handler()
+                self.server = PooledHTTPServer((host, port), handler_class, workers=workers)
+                logger.info(f"Starting webhook server on {host}:{port}")
+                logger.info(f"Webhook URL: http://{host}:{port}/webhook/overseerr")
+                logger.info(f"Health check: http://{host}:{port}/webhook/health")
+                self.server.serve_forever()
+            except Exception as e:
+                logger.error(f"Webhook server error: {e}")
+        
+        self.server_thread = Thread(target=run_server, daemon=True)
+        self.server_thread.start()
+        logger.info("Webhook server started in background thread")
+        
+        return self.server_thread
+    
+    def stop_webhook_server(self):
+        """Stop the webhook server."""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            logger.info("Webhook server stopped")
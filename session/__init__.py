@@ -1 +1 @@
-# Session management package
+# Session management package
@@ -1,167 +1,295 @@
-"""
-Session management for different bot modes.
-"""
-import json
-import os
-import logging
-from typing import Optional
-
-from config.constants import USER_SESSIONS_FILE, SHARED_SESSION_FILE, USER_SELECTION_FILE
-
-logger = logging.getLogger(__name__)
-
-###############################################################################
-#                        NORMAL MODE SESSION MANAGEMENT
-###############################################################################
-
-def load_user_sessions():
-    try:
-        with open(USER_SESSIONS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-def save_user_session(telegram_user_id: int, session_data: dict):
-    """Save a user's session data to a JSON file for Normal mode."""
-    try:
-        # Load existing sessions if file exists
-        try:
-            with open(USER_SESSIONS_FILE, "r", encoding="utf-8") as f:
-                all_sessions = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.info(f"Creating new sessions file: {e}")
-            all_sessions = {}
-        
-        # Update with new session data
-        all_sessions[str(telegram_user_id)] = session_data
-        
-        # Write to file
-        with open(USER_SESSIONS_FILE, "w", encoding="utf-8") as f:
-            json.dump(all_sessions, f, indent=2)
-        logger.info(f"Saved session for Telegram user {telegram_user_id} to {USER_SESSIONS_FILE}")
-    except Exception as e:
-        logger.error(f"Failed to save session for Telegram user {telegram_user_id}: {e}")
-        raise  # Re-raise to catch in caller if needed
-
-def load_user_session(telegram_user_id: int) -> dict | None:
-    """Load a user's session data from the JSON file."""
-    try:
-        with open(USER_SESSIONS_FILE, "r", encoding="utf-8") as f:
-            all_sessions = json.load(f)
-            return all_sessions.get(str(telegram_user_id))
-    except (FileNotFoundError, json.JSONDecodeError):
-        return None
-
-def save_user_sessions(sessions):
-    with open(USER_SESSIONS_FILE, "w", encoding="utf-8") as f:
-        json.dump(sessions, f, indent=2)
-    logger.info("Saved user sessions")
-
-def clear_user_session(telegram_user_id: int):
-    """Remove a user's session from persistent storage."""
-    try:
-        # Load all sessions
-        try:
-            with open(USER_SESSIONS_FILE, "r", encoding="utf-8") as f:
-                all_sessions = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            logger.info("No sessions file found, nothing to clear")
-            return
-
-        # Remove the specific user's session
-        user_id_str = str(telegram_user_id)
-        if user_id_str in all_sessions:
-            del all_sessions[user_id_str]
-            
-            # Save back to file
-            with open(USER_SESSIONS_FILE, "w", encoding="utf-8") as f:
-                json.dump(all_sessions, f, indent=2)
-            logger.info(f"Cleared persistent session for user {telegram_user_id}")
-        else:
-            logger.info(f"No persistent session found for user {telegram_user_id}")
-            
-    except Exception as e:
-        logger.error(f"Error clearing session for user {telegram_user_id}: {e}")
-
-###############################################################################
-#                        SHARED MODE SESSION MANAGEMENT
-###############################################################################
-
-def load_shared_session():
-    try:
-        with open(SHARED_SESSION_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return None
-
-def save_shared_session(session_data):
-    with open(SHARED_SESSION_FILE, "w", encoding="utf-8") as f:
-        json.dump(session_data, f, indent=2)
-    logger.info("Saved shared session")
-
-def clear_shared_session():
-    """Clear the shared session data."""
-    if os.path.exists(SHARED_SESSION_FILE):
-        os.remove(SHARED_SESSION_FILE)
-        logger.info("Cleared shared session")
-
-###############################################################################
-#                        API MODE USER SELECTION MANAGEMENT
-###############################################################################
-
-def load_user_selections() -> dict:
-    """
-    Load a dict from user_selection.json:
-    {
-      "<telegram_user_id>": {
-        "userId": 10,
-        "userName": "Some Name"
-      },
-      ...
-    }
-    """
-    if not os.path.exists(USER_SELECTION_FILE):
-        logger.info("No user_selection.json found. Returning empty dictionary.")
-        return {}
-    try:
-        with open(USER_SELECTION_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            logger.info(f"Loaded user selections from {USER_SELECTION_FILE}: {data}")
-            return data
-    except (FileNotFoundError, json.JSONDecodeError):
-        logger.warning("user_selection.json not found or invalid. Returning empty dictionary.")
-        return {}
-
-def save_user_selection(telegram_user_id: int, user_id: int, user_name: str):
-    """
-    Store the user's Overseerr selection in user_selection.json:
-    {
-      "<telegram_user_id>": {
-        "userId": 10,
-        "userName": "DisplayName"
-      }
-    }
-    """
-    data = load_user_selections()
-    data[str(telegram_user_id)] = {
-        "userId": user_id,
-        "userName": user_name
-    }
-    try:
-        with open(USER_SELECTION_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-        logger.info(f"Saved user selection for Telegram user {telegram_user_id}: (Overseerr user {user_id})")
-    except Exception as e:
-        logger.error(f"Failed to save user selection: {e}")
-
-def get_saved_user_for_telegram_id(telegram_user_id: int):
-    """
-    Return (userId, userName) or (None, None) if not found.
-    """
-    data = load_user_selections()
-    entry = data.get(str(telegram_user_id))
-    if entry:
-        logger.info(f"Found saved user for Telegram user {telegram_user_id}: {entry}")
-        return entry["userId"], entry["userName"]
-    logger.info(f"No saved user found for Telegram user {telegram_user_id}.")
-    return None, None
+"""
+Session management for different bot modes.
+"""
+import os
+import copy
+import atexit
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+from config.constants import USER_SESSIONS_FILE, SHARED_SESSION_FILE, USER_SELECTION_FILE
+from utils.json_utils import loads, dumps_bytes, JSONDecodeError
+
+logger = logging.getLogger(__name__)
+
+# Parsed file contents, reused until the file's mtime changes. "dirty" marks
+# in-memory changes that haven't been flushed to disk yet; "written" holds the
+# bytes of the last flush so unchanged data isn't rewritten.
+_sessions_cache = {"mtime": None, "data": None, "dirty": False, "written": None}
+_selections_cache = {"mtime": None, "data": None, "dirty": False, "written": None}
+_shared_cache = {"mtime": None, "data": None, "dirty": False, "written": None}  # Read-only: saved atomically
+# Handlers and the webhook thread may touch the files concurrently
+_cache_lock = threading.RLock()
+# Serializes disk writes, which run outside _cache_lock so a slow disk doesn't block cache readers
+_disk_lock = threading.Lock()
+
+# Writes made inside the event loop are coalesced and flushed after this delay
+FLUSH_DELAY = 0.5
+_flush_handle = None
+_flush_loop = None
+
+def _load(path: str, cache: dict) -> dict:
+    """
+    Return the parsed contents of a JSON file, re-reading it only when its mtime changed.
+    Returns an empty dict if the file doesn't exist; raises JSONDecodeError if it is invalid.
+    """
+    with _cache_lock:
+        if cache["dirty"]:
+            return cache["data"]
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            cache.update(mtime=None, data=None, written=None)
+            return {}
+        if cache["data"] is not None and cache["mtime"] == mtime:
+            return cache["data"]
+        # Hand raw bytes to the parser: orjson decodes UTF-8 itself, skipping an intermediate str
+        with open(path, "rb") as f:
+            data = loads(f.read())
+        cache.update(mtime=mtime, data=data, written=None)
+        return data
+
+def _snapshot(data):
+    """
+    Copy cached data before handing it to callers. Edits to the copy only reach the
+    cache (and disk) through _write, so they can't bypass the dirty/flush bookkeeping.
+    """
+    return copy.deepcopy(data)
+
+def _stage(cache: dict, data: dict):
+    """Store data in the cache and mark it for the next flush."""
+    with _cache_lock:
+        cache.update(data=data, dirty=True)
+
+def _schedule_flush():
+    """
+    Arrange for pending changes to be written to disk.
+    Inside the event loop the write is debounced; elsewhere it happens immediately.
+    Must not be called while holding _cache_lock: a flush takes _disk_lock and then
+    _cache_lock, so calling it under _cache_lock can deadlock with a concurrent flush.
+    """
+    global _flush_handle, _flush_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush_sessions()
+        return
+    if _flush_handle is None or _flush_loop is not loop:
+        _flush_loop = loop
+        _flush_handle = loop.call_later(FLUSH_DELAY, _on_flush_timer)
+
+def _write(path: str, cache: dict, data: dict):
+    """Store data in the cache and schedule it to be written to disk."""
+    _stage(cache, data)
+    _schedule_flush()
+
+def _on_flush_timer():
+    global _flush_handle
+    _flush_handle = None
+    # The flush fsyncs, so keep it off the event loop
+    _flush_loop.run_in_executor(None, flush_sessions)
+
+def _atomic_write(path: str, data: bytes):
+    """Write data to a temp file and swap it into place so a crash can't truncate the file."""
+    tmp_path = path + ".tmp"
+    # os.open keeps the file private (it holds session cookies); the file object retries short writes
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _flush(path: str, cache: dict):
+    """Write the cached data to disk if it has unsaved changes."""
+    with _disk_lock:
+        with _cache_lock:
+            if not cache["dirty"]:
+                return
+            data = cache["data"]
+            payload = dumps_bytes(data, indent=True)
+            if payload == cache["written"] and os.path.exists(path):
+                cache["dirty"] = False
+                return
+        # If this raises, the cache stays dirty and the next flush retries
+        _atomic_write(path, payload)
+        with _cache_lock:
+            cache.update(mtime=os.stat(path).st_mtime_ns, written=payload)
+            if cache["data"] is data:
+                cache["dirty"] = False  # Otherwise a newer save arrived mid-write and is still pending
+
+def flush_sessions():
+    """Write any pending session and user selection changes to disk."""
+    for path, cache in ((USER_SESSIONS_FILE, _sessions_cache), (USER_SELECTION_FILE, _selections_cache)):
+        try:
+            _flush(path, cache)
+        except Exception as e:
+            logger.error(f"Failed to write {path}: {e}")
+
+atexit.register(flush_sessions)
+
+###############################################################################
+#                        NORMAL MODE SESSION MANAGEMENT
+###############################################################################
+
+def load_user_sessions():
+    try:
+        return _snapshot(_load(USER_SESSIONS_FILE, _sessions_cache))
+    except JSONDecodeError:
+        return {}
+
+def save_user_session(telegram_user_id: int, session_data: dict):
+    """Save a user's session data to a JSON file for Normal mode."""
+    try:
+        with _cache_lock:
+            # Load existing sessions if file exists
+            try:
+                all_sessions = dict(_load(USER_SESSIONS_FILE, _sessions_cache))
+            except JSONDecodeError as e:
+                logger.info(f"Creating new sessions file: {e}")
+                all_sessions = {}
+            
+            # Update with new session data
+            all_sessions[str(telegram_user_id)] = session_data
+            _stage(_sessions_cache, all_sessions)
+        
+        # Write to file, outside _cache_lock
+        _schedule_flush()
+        logger.info(f"Saved session for Telegram user {telegram_user_id} to {USER_SESSIONS_FILE}")
+    except Exception as e:
+        logger.error(f"Failed to save session for Telegram user {telegram_user_id}: {e}")
+        raise  # Re-raise to catch in caller if needed
+
+def load_user_session(telegram_user_id: int) -> dict | None:
+    """Load a user's session data from the JSON file."""
+    try:
+        return _snapshot(_load(USER_SESSIONS_FILE, _sessions_cache).get(str(telegram_user_id)))
+    except JSONDecodeError:
+        return None
+
+def save_user_sessions(sessions):
+    _write(USER_SESSIONS_FILE, _sessions_cache, sessions)
+    logger.info("Saved user sessions")
+
+def clear_user_session(telegram_user_id: int):
+    """Remove a user's session from persistent storage."""
+    try:
+        with _cache_lock:
+            # Load all sessions
+            try:
+                all_sessions = dict(_load(USER_SESSIONS_FILE, _sessions_cache))
+            except JSONDecodeError:
+                logger.info("No valid sessions file found, nothing to clear")
+                return
+
+            # Remove the specific user's session
+            user_id_str = str(telegram_user_id)
+            if user_id_str in all_sessions:
+                del all_sessions[user_id_str]
+                _stage(_sessions_cache, all_sessions)
+            else:
+                logger.info(f"No persistent session found for user {telegram_user_id}")
+                return
+        
+        # Save back to file, outside _cache_lock
+        _schedule_flush()
+        logger.info(f"Cleared persistent session for user {telegram_user_id}")
+            
+    except Exception as e:
+        logger.error(f"Error clearing session for user {telegram_user_id}: {e}")
+
+###############################################################################
+#                        SHARED MODE SESSION MANAGEMENT
+###############################################################################
+
+def load_shared_session():
+    """Return the shared session, parsing the file only when it changed; None if missing or invalid."""
+    try:
+        return _snapshot(_load(SHARED_SESSION_FILE, _shared_cache)) or None
+    except (FileNotFoundError, JSONDecodeError):
+        return None
+
+def save_shared_session(session_data):
+    _atomic_write(SHARED_SESSION_FILE, dumps_bytes(session_data, indent=True))
+    logger.info("Saved shared session")
+
+def clear_shared_session():
+    """Clear the shared session data."""
+    if os.path.exists(SHARED_SESSION_FILE):
+        os.remove(SHARED_SESSION_FILE)
+        logger.info("Cleared shared session")
+
+###############################################################################
+#                        API MODE USER SELECTION MANAGEMENT
+###############################################################################
+
+def load_user_selections() -> dict:
+    """
+    Load a dict from user_selection.json:
+    {
+      "<telegram_user_id>": {
+        "userId": 10,
+        "userName": "Some Name"
+      },
+      ...
+    }
+    """
+    if not _selections_cache["dirty"] and not os.path.exists(USER_SELECTION_FILE):
+        logger.info("No user_selection.json found. Returning empty dictionary.")
+        return {}
+    try:
+        data = _snapshot(_load(USER_SELECTION_FILE, _selections_cache))
+        logger.info(f"Loaded user selections from {USER_SELECTION_FILE}: {data}")
+        return data
+    except (FileNotFoundError, JSONDecodeError):
+        logger.warning("user_selection.json not found or invalid. Returning empty dictionary.")
+        return {}
+
+def save_user_selection(telegram_user_id: int, user_id: int, user_name: str):
+    """
+    Store the user's Overseerr selection in user_selection.json:
+    {
+      "<telegram_user_id>": {
+        "userId": 10,
+        "userName": "DisplayName"
+      }
+    }
+    """
+    with _cache_lock:
+        data = load_user_selections()
+        data[str(telegram_user_id)] = {
+            "userId": user_id,
+            "userName": user_name
+        }
+        _stage(_selections_cache, data)
+    # Write to file, outside _cache_lock
+    try:
+        _schedule_flush()
+        logger.info(f"Saved user selection for Telegram user {telegram_user_id}: (Overseerr user {user_id})")
+    except Exception as e:
+        logger.error(f"Failed to save user selection: {e}")
+
+def get_saved_user_for_telegram_id(telegram_user_id: int):
+    """
+    Return (userId, userName) or (None, None) if not found.
+    Reads the mtime-keyed selections cache directly, so edits made outside the bot are picked up.
+    """
+    try:
+        entry = _load(USER_SELECTION_FILE, _selections_cache).get(str(telegram_user_id))
+    except JSONDecodeError:
+        entry = None
+    user_id, user_name = (entry["userId"], entry["userName"]) if entry else (None, None)
+    if user_id is not None:
+        logger.debug(f"Found saved user for Telegram user {telegram_user_id}: {user_name} ({user_id})")
+    else:
+        logger.debug(f"No saved user found for Telegram user {telegram_user_id}.")
+    return user_id, user_name
@@ -1 +1 @@
-# Test package initialization
+# Test package initialization
@@ -0,0 +1,31 @@
+"""
+Sample media results shared by the Request More Seasons tests.
+
+These are read-only; copy them before mutating in a test.
+"""
+
+SAMPLE_TV_SHOW = {
+    'id': 12345,
+    'title': 'Test TV Show',
+    'year': '2023',
+    'mediaType': 'tv',
+    'poster': '/test_poster.jpg',
+    'description': 'Test description for a TV show',
+    'overseerr_id': 67890,
+    'release_date_full': '2023-01-01',
+    'status_hd': 2,  # Pending - reportable
+    'status_4k': 1   # Unknown
+}
+
+SAMPLE_MOVIE = {
+    'id': 54321,
+    'title': 'Test Movie',
+    'year': '2023',
+    'mediaType': 'movie',
+    'poster': '/test_movie.jpg',
+    'description': 'Test description for a movie',
+    'overseerr_id': 98765,
+    'release_date_full': '2023-06-15',
+    'status_hd': 3,  # Processing
+    'status_4k': 1   # Unknown
+}
@@ -0,0 +1,8 @@
+"""
+Shared pytest configuration for the test suite.
+"""
+import os
+import sys
+
+# Make the project root importable once per session instead of in every module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
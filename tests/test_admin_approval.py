@@ -7,6 +7,7 @@ from unittest.mock import Mock, patch, AsyncMock
 import sys
 import os
 import json
+import asyncio
 from datetime import datetime, timezone
 
 # Add the parent directory to the path to import modules
@@ -89,8 +90,80 @@ class TestAdminNotifications(unittest.TestCase):
         # - Users marked as admin in config
         # - Via private chat (not groups)
         # - With proper error handling
-        pass
-    
+        from notifications.admin_notifications import AdminNotificationManager
+        
+        self.mock_bot.send_message = AsyncMock(side_effect=[Exception("Forbidden"), None])
+        manager = AdminNotificationManager(self.mock_bot)
+        admin_users = [
+            {"user_id": 111, "username": "admin_one", "chat_id": 111},
+            {"user_id": 222, "username": "admin_two", "chat_id": 222}
+        ]
+        
+        asyncio.run(manager.send_admin_notifications(admin_users, "New request", None))
+        
+        # A failure for the first admin must not prevent delivery to the second
+        sent_chat_ids = [call.kwargs["chat_id"] for call in self.mock_bot.send_message.call_args_list]
+        self.assertEqual(sent_chat_ids, [111, 222])
+
+    @patch('config.config_manager.load_config')
+    def test_admin_users_cached_between_calls(self, mock_load_config):
+        """Test that repeated admin lookups don't re-read the config file"""
+        from config.config_manager import invalidate_config_cache
+        from notifications.admin_notifications import AdminNotificationManager
+
+        mock_load_config.return_value = self.mock_config
+        invalidate_config_cache()
+        manager = AdminNotificationManager(self.mock_bot)
+
+        first = manager.get_admin_users()
+        second = manager.get_admin_users()
+
+        self.assertEqual(first, second)
+        self.assertEqual([admin["user_id"] for admin in first], [123456789])
+        mock_load_config.assert_called_once()
+        invalidate_config_cache()
+
+    def test_rate_limiter_delays_burst_over_limit(self):
+        """Test that sends above the per-period limit are delayed, not dropped"""
+        from notifications.admin_notifications import RateLimiter
+        import time
+
+        limiter = RateLimiter(2, 0.1)
+
+        async def burst():
+            start = time.monotonic()
+            for _ in range(3):
+                async with limiter:
+                    pass
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(burst())
+
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_duplicate_webhooks_coalesced(self):
+        """Test that back-to-back webhooks for one request notify admins once"""
+        from notifications.admin_notifications import AdminNotificationManager
+
+        manager = AdminNotificationManager(self.mock_bot)
+        manager.debounce_delay = 0.01
+        manager.get_admin_users = Mock(return_value=[{"user_id": 111, "username": "admin", "chat_id": 111}])
+        manager.send_admin_notifications = AsyncMock()
+        webhook_data = {
+            "notification_type": "MEDIA_PENDING",
+            "media": {"media_type": "movie", "title": "The Matrix"},
+            "request": {"id": 123}
+        }
+
+        async def burst():
+            await manager.process_new_request_webhook(webhook_data)
+            await manager.process_new_request_webhook(dict(webhook_data, event="request.new"))
+            await asyncio.sleep(0.05)
+
+        asyncio.run(burst())
+
+        manager.send_admin_notifications.assert_called_once()
+
     def test_private_chat_only_restriction(self):
         """Test that admin notifications are sent to private chats only"""
         # Verify that admin notifications are not sent to group chats
@@ -124,7 +197,7 @@ class TestAdminNotifications(unittest.TestCase):
         # - Proper callback data for each action
         pass
 
-    @patch('notifications.admin_notifications.load_config')
+    @patch('notifications.admin_notifications.load_cached_config')
     async def test_process_new_request_webhook_integration(self, mock_load_config):
         """Test end-to-end webhook processing for new requests"""
         # Integration test for processing a new request webhook
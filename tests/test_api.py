@@ -1,35 +1,35 @@
-# Tests for the Overseerr API integration
-import unittest
-from unittest.mock import Mock, patch
-import sys
-import os
-
-# Add the parent directory to the path to import modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from api.overseerr_api import OverseerrAPI
-
-
-class TestOverseerrAPI(unittest.TestCase):
-    """Test cases for OverseerrAPI class"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.api = OverseerrAPI("http://test.overseerr.com", "test_api_key")
-    
-    def test_seasons_handling(self):
-        """Test that seasons parameter handles None values correctly"""
-        # This would test the fix for the anime selection bug
-        pass
-    
-    def test_api_connection(self):
-        """Test API connection validation"""
-        pass
-    
-    def test_media_request(self):
-        """Test media request functionality"""
-        pass
-
-
-if __name__ == '__main__':
-    unittest.main()
+# Tests for the Overseerr API integration
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add the parent directory to the path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.overseerr_api import OverseerrAPI
+
+
+class TestOverseerrAPI(unittest.TestCase):
+    """Test cases for OverseerrAPI class"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.api = OverseerrAPI("http://test.overseerr.com", "test_api_key")
+    
+    def test_seasons_handling(self):
+        """Test that seasons parameter handles None values correctly"""
+        # This would test the fix for the anime selection bug
+        pass
+    
+    def test_api_connection(self):
+        """Test API connection validation"""
+        pass
+    
+    def test_media_request(self):
+        """Test media request functionality"""
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Unit tests for the shared mtime-keyed configuration cache in config_manager.
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import config.config_manager as config_manager
+
+
+class TestLoadCachedConfig(unittest.TestCase):
+    """Test cases for load_cached_config"""
+
+    def setUp(self):
+        """Point the config manager at a throwaway bot_config.json"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.tmp_dir.name, "bot_config.json")
+        patcher = patch.object(config_manager, "CONFIG_FILE", self.config_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        config_manager.invalidate_config_cache()
+
+    def tearDown(self):
+        config_manager.invalidate_config_cache()
+        self.tmp_dir.cleanup()
+
+    def _write_file(self, config: dict, mtime_ns: int):
+        with open(self.config_file, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        os.utime(self.config_file, ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_file_is_loaded_once(self):
+        """Test that repeated lookups of an unchanged file share one parsed config"""
+        self._write_file({"group_mode": True}, 1_700_000_000_000_000_000)
+
+        with patch.object(config_manager, "load_config", wraps=config_manager.load_config) as mock_load:
+            first = config_manager.load_cached_config()
+            second = config_manager.load_cached_config()
+
+        self.assertIs(first, second)
+        self.assertTrue(first["group_mode"])
+        mock_load.assert_called_once()
+
+    def test_changed_mtime_reloads_file(self):
+        """Test that a config edited outside the bot is picked up on the next lookup"""
+        self._write_file({"group_mode": False}, 1_700_000_000_000_000_000)
+        config_manager.load_cached_config()
+
+        self._write_file({"group_mode": True}, 1_700_000_001_000_000_000)
+
+        self.assertTrue(config_manager.load_cached_config()["group_mode"])
+
+    def test_save_config_invalidates_cache(self):
+        """Test that a save is visible immediately, even within the file's mtime granularity"""
+        self._write_file({"group_mode": False}, 1_700_000_000_000_000_000)
+        config = config_manager.load_config()
+        config_manager.load_cached_config()
+
+        config["group_mode"] = True
+        config_manager.save_config(config)
+        os.utime(self.config_file, ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+
+        self.assertTrue(config_manager.load_cached_config()["group_mode"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,35 +1,30 @@
-# Tests for Telegram bot handlers
-import unittest
-from unittest.mock import Mock, patch, AsyncMock
-import sys
-import os
-
-# Add the parent directory to the path to import modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from handlers.callback_handlers import CallbackHandlers
-
-
-class TestCallbackHandlers(unittest.TestCase):
-    """Test cases for CallbackHandlers"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.handler = CallbackHandlers()
-    
-    def test_safe_message_editing(self):
-        """Test safe message editing functionality"""
-        # This would test the fix for message editing conflicts
-        pass
-    
-    def test_logout_functionality(self):
-        """Test logout handler"""
-        pass
-    
-    def test_anime_selection(self):
-        """Test anime selection callback"""
-        pass
-
-
-if __name__ == '__main__':
-    unittest.main()
+# Tests for Telegram bot handlers
+import unittest
+from unittest.mock import Mock, patch, AsyncMock
+
+from handlers.callback_handlers import CallbackHandlers
+
+
+class TestCallbackHandlers(unittest.TestCase):
+    """Test cases for CallbackHandlers"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.handler = CallbackHandlers()
+    
+    def test_safe_message_editing(self):
+        """Test safe message editing functionality"""
+        # This would test the fix for message editing conflicts
+        pass
+    
+    def test_logout_functionality(self):
+        """Test logout handler"""
+        pass
+    
+    def test_anime_selection(self):
+        """Test anime selection callback"""
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,14 @@
 Test script for health check functionality.
 This script tests the health checker without running the full bot.
 """
+import asyncio
 import sys
 import os
 import time
 import signal
+import tempfile
 import threading
+import unittest
 from pathlib import Path
 
 # Add the parent directory to the path so we can import our modules
@@ -15,25 +18,35 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from utils.health_check import HealthChecker
 
-def test_health_checker():
+def run_health_checker_test():
     """Test the health checker functionality."""
     print("Testing Health Checker...")
     
-    # Create a test health checker with a test file
-    test_health_file = "data/test_bot_health.txt"
-    health_checker = HealthChecker(test_health_file)
+    # Create a test health checker with a per-worker test file so parallel
+    # pytest-xdist workers don't collide on the same path
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    test_health_file = f"data/test_bot_health_{worker}.txt"
+    # Short interval so the update cycle completes in well under a second;
+    # the event wakes the test as soon as the writer thread touches the file
+    updated = threading.Event()
+    health_checker = HealthChecker(test_health_file, update_interval=0.1, on_update=updated)
     
     try:
         # Test 1: Start health monitoring
         print("1. Starting health monitoring...")
         health_checker.start_health_monitor()
         
-        # Wait a moment for the first health file to be created
-        time.sleep(2)
+        # Wait for the first health file to be created
+        updated.wait(timeout=5)
         
         # Test 2: Check if health file exists
         print("2. Checking if health file exists...")
-        if os.path.exists(test_health_file):
+        try:
+            # One stat both proves the file exists and gives the baseline mtime
+            initial_stat = os.stat(test_health_file)
+        except FileNotFoundError:
+            initial_stat = None
+        if initial_stat is not None:
             print("   ✅ Health file created successfully")
             with open(test_health_file, 'r') as f:
                 content = f.read()
@@ -44,13 +57,18 @@ def test_health_checker():
         
         # Test 3: Wait and check if file gets updated
         print("3. Waiting for health file update...")
-        initial_mtime = os.path.getmtime(test_health_file)
+        initial_mtime = initial_stat.st_mtime
         
-        # Wait for at least one update cycle (30+ seconds)
-        print("   Waiting 35 seconds for health file update...")
-        time.sleep(35)
+        # Block only until the writer thread reports an update. Writes a few
+        # milliseconds apart can share an mtime, so keep waiting until it moves.
+        print("   Waiting for health file update...")
+        deadline = time.monotonic() + 5
+        new_mtime = initial_mtime
+        while new_mtime <= initial_mtime and time.monotonic() < deadline:
+            updated.clear()
+            updated.wait(timeout=max(0, deadline - time.monotonic()))
+            new_mtime = os.stat(test_health_file).st_mtime
         
-        new_mtime = os.path.getmtime(test_health_file)
         if new_mtime > initial_mtime:
             print("   ✅ Health file updated successfully")
         else:
@@ -62,7 +80,8 @@ def test_health_checker():
         
         # Simulate the Docker health check logic
         try:
-            current_time = time.time()
+            # Fixed "now" keeps the age check independent of host load
+            current_time = new_mtime + 1
             file_age = current_time - new_mtime
             
             if file_age <= 120:  # Within 2 minutes
@@ -92,6 +111,71 @@ def test_health_checker():
             os.remove(test_health_file)
         print("   Cleanup completed")
 
+class TestHealthChecker(unittest.TestCase):
+    """Wall-clock test of the background health file writer."""
+
+    def test_health_checker(self):
+        os.makedirs("data", exist_ok=True)
+        self.assertTrue(run_health_checker_test())
+
+    def test_health_file_freshness_window(self):
+        """A heartbeat keeps the bot healthy for 120s, then it reports unhealthy."""
+        with tempfile.TemporaryDirectory() as tmp:
+            checker = HealthChecker(os.path.join(tmp, "bot_health.txt"))
+
+            self.assertFalse(checker.is_healthy())
+            # No file yet, so the touch also creates it
+            checker.touch_health_file()
+            self.assertTrue(os.path.exists(checker.health_file_path))
+            self.assertTrue(checker.is_healthy())
+
+            checker.last_heartbeat = time.monotonic() - 121
+            self.assertFalse(checker.is_healthy())
+
+    def test_stop_interrupts_update_wait(self):
+        """Stopping the monitor returns promptly instead of waiting out the update interval."""
+        with tempfile.TemporaryDirectory() as tmp:
+            checker = HealthChecker(os.path.join(tmp, "bot_health.txt"), update_interval=30)
+            checker.start_health_monitor()
+            start = time.monotonic()
+            checker.stop_health_monitor()
+            self.assertLess(time.monotonic() - start, 1)
+            self.assertFalse(checker.thread.is_alive())
+
+    def test_async_stop_finishes_task_before_loop_closes(self):
+        """Stopping from the loop awaits the heartbeat task, so a later atexit stop has nothing to cancel."""
+        with tempfile.TemporaryDirectory() as tmp:
+            checker = HealthChecker(os.path.join(tmp, "bot_health.txt"), update_interval=30)
+
+            async def run_and_stop():
+                checker.start_health_monitor_async()
+                await asyncio.sleep(0)
+                task = checker._task
+                await checker.stop_health_monitor_async()
+                return task
+
+            task = asyncio.run(run_and_stop())
+
+            self.assertTrue(task.cancelled())
+            checker.stop_health_monitor()
+            checker.cleanup_health_file()
+            self.assertFalse(os.path.exists(checker.health_file_path))
+
+    def test_stop_after_loop_closed_does_not_raise(self):
+        """A heartbeat task left pending on a closed loop is skipped instead of raising on cancel."""
+        with tempfile.TemporaryDirectory() as tmp:
+            checker = HealthChecker(os.path.join(tmp, "bot_health.txt"), update_interval=30)
+            loop = asyncio.new_event_loop()
+            # The task is abandoned on purpose; don't report it as destroyed while pending
+            loop.set_exception_handler(lambda loop, context: None)
+            checker.start_health_monitor_async(loop)
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.close()
+
+            checker.stop_health_monitor()
+
+            self.assertFalse(checker.is_running)
+
 def main():
     """Main function."""
     print("🏥 Health Checker Test")
@@ -100,7 +184,7 @@ def main():
     # Ensure data directory exists
     os.makedirs("data", exist_ok=True)
     
-    success = test_health_checker()
+    success = run_health_checker_test()
     
     if success:
         print("\n🎉 All health check tests passed!")
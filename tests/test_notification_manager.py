@@ -0,0 +1,41 @@
+"""
+Unit tests for Overseerr notification settings calls in notification_manager.
+"""
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+import notifications.notification_manager as notification_manager
+
+
+def _client_returning(response: httpx.Response) -> httpx.AsyncClient:
+    """Build an AsyncClient whose every request gets the given response."""
+    return httpx.AsyncClient(base_url="http://overseerr.test/api/v1",
+                             transport=httpx.MockTransport(lambda request: response))
+
+
+class TestNonJsonResponses(unittest.IsolatedAsyncioTestCase):
+    """Test that a 200 response with a non-JSON body is handled like any other API failure"""
+
+    async def asyncSetUp(self):
+        self.client = _client_returning(httpx.Response(200, text="<html>Maintenance</html>"))
+        patcher = patch.object(notification_manager, "CLIENT", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        notification_manager._user_settings_cache.clear()
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        notification_manager._user_settings_cache.clear()
+
+    async def test_global_settings_returns_none(self):
+        self.assertIsNone(await notification_manager.get_global_telegram_notifications())
+
+    async def test_user_settings_returns_empty_dict(self):
+        self.assertEqual(await notification_manager.get_user_notification_settings(1), {})
+        self.assertNotIn(1, notification_manager._user_settings_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
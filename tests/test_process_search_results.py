@@ -0,0 +1,44 @@
+"""
+Unit tests for turning raw Overseerr search results into the bot's media dicts.
+"""
+import unittest
+
+from api.overseerr_api import process_search_results
+
+
+def _search_result(**overrides):
+    """Build a raw Overseerr TV search result, overriding any fields given."""
+    result = {
+        'id': 12345,
+        'mediaType': 'tv',
+        'name': 'Test TV Show',
+        'firstAirDate': '2023-01-01',
+        'overview': 'Test description for a TV show',
+        'mediaInfo': {'id': 67890, 'status': 2, 'status4k': 1}
+    }
+    result.update(overrides)
+    return result
+
+
+class TestProcessSearchResults(unittest.TestCase):
+    """Test cases for process_search_results"""
+
+    def test_null_overview_uses_placeholder(self):
+        """Test that a null overview is replaced instead of breaking the whole result list"""
+        processed = process_search_results([_search_result(overview=None)])
+
+        self.assertEqual(processed[0]['description'], "No description available")
+        self.assertEqual(processed[0]['short_description'], "No description available")
+
+    def test_long_overview_is_truncated_once(self):
+        """Test that the short description is cut to 300 characters while the full text is kept"""
+        overview = "x" * 400
+
+        processed = process_search_results([_search_result(overview=overview)])
+
+        self.assertEqual(processed[0]['description'], overview)
+        self.assertEqual(processed[0]['short_description'], "x" * 300 + "...")
+
+
+if __name__ == '__main__':
+    unittest.main()
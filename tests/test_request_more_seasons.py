@@ -1,56 +1,49 @@
 # Tests for the Request More Seasons feature
+import time
 import unittest
+from collections import OrderedDict
 from unittest.mock import Mock, patch, AsyncMock
-import sys
-import os
-import asyncio
 
-# Add the parent directory to the path to import modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from telegram import CallbackQuery
+from telegram.ext import CallbackContext
 
-from api.overseerr_api import get_tv_show_seasons_with_status, get_unavailable_seasons
-from handlers.ui_handlers import build_media_details_message
-from handlers.callback_handlers import handle_request_more_seasons
+from api.overseerr_api import get_tv_show_seasons_with_status, get_requestable_seasons
+from handlers.ui_handlers import build_media_details_message, get_cached_seasons, SEASONS_CACHE_TTL
+from handlers.callback_handlers import handle_request_more_seasons, handle_season_toggle
+from tests._fixtures import SAMPLE_TV_SHOW, SAMPLE_MOVIE
 
 
-class TestRequestMoreSeasons(unittest.TestCase):
-    """Test cases for Request More Seasons functionality"""
+def _find_button(keyboard, text):
+    """Return the first button labelled ``text`` in an inline keyboard, or None."""
+    return next((button for row in keyboard for button in row if button.text == text), None)
+
+
+def _json_response(payload):
+    """Build a stand-in for a successful HTTP response returning ``payload``."""
+    response = Mock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = payload
+    return response
+
+
+class _RequestMoreSeasonsTestCase(unittest.IsolatedAsyncioTestCase):
+    """Shared fixtures for the Request More Seasons test cases"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.sample_tv_show = {
-            'id': 12345,
-            'title': 'Test TV Show',
-            'year': '2023',
-            'mediaType': 'tv',
-            'poster': '/test_poster.jpg',
-            'description': 'Test description for a TV show',
-            'overseerr_id': 67890,
-            'release_date_full': '2023-01-01',
-            'status_hd': 2,  # Pending
-            'status_4k': 1   # Unknown
-        }
-        
-        self.sample_movie = {
-            'id': 54321,
-            'title': 'Test Movie',
-            'year': '2023',
-            'mediaType': 'movie',
-            'poster': '/test_movie.jpg',
-            'description': 'Test description for a movie',
-            'overseerr_id': 98765,
-            'release_date_full': '2023-06-15',
-            'status_hd': 3,  # Processing
-            'status_4k': 1   # Unknown
-        }
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared, read-only test fixtures"""
+        cls.sample_tv_show = SAMPLE_TV_SHOW
+        cls.sample_movie = SAMPLE_MOVIE
+
 
+class TestGetSeasons(_RequestMoreSeasonsTestCase):
+    """Test cases for fetching season availability from Overseerr"""
+    
     @patch('api.overseerr_api.requests.get')
-    def test_get_tv_show_seasons_with_status_success(self, mock_get):
+    async def test_get_tv_show_seasons_with_status_success(self, mock_get):
         """Test successful retrieval of TV show seasons with status"""
         # Mock API response
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {
+        mock_get.return_value = _json_response({
             'seasons': [
                 {'seasonNumber': 0, 'episodeCount': 1, 'status': 5},  # Specials - should be filtered
                 {'seasonNumber': 1, 'episodeCount': 10, 'status': 5},  # Available
@@ -58,14 +51,10 @@ class TestRequestMoreSeasons(unittest.TestCase):
                 {'seasonNumber': 3, 'episodeCount': 8, 'status': 1},   # Unknown (unavailable)
                 {'seasonNumber': 4, 'episodeCount': 0, 'status': 1}    # No episodes - should be filtered
             ]
-        }
-        mock_get.return_value = mock_response
+        })
         
         # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(get_tv_show_seasons_with_status(12345))
-        loop.close()
+        result = await get_tv_show_seasons_with_status(12345)
         
         # Verify results
         self.assertEqual(len(result), 3)  # Should have 3 valid seasons (1, 2, 3)
@@ -86,198 +75,126 @@ class TestRequestMoreSeasons(unittest.TestCase):
         self.assertEqual(season3['status'], 1)
 
     @patch('api.overseerr_api.requests.get')
-    def test_get_tv_show_seasons_with_status_api_error(self, mock_get):
+    async def test_get_tv_show_seasons_with_status_api_error(self, mock_get):
         """Test handling of API errors when fetching seasons"""
         # Mock a requests.RequestException which is what the function actually catches
         from requests.exceptions import RequestException
         mock_get.side_effect = RequestException("API connection failed")
         
         # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(get_tv_show_seasons_with_status(12345))
-        loop.close()
+        result = await get_tv_show_seasons_with_status(12345)
         
         # Should return empty list on error
         self.assertEqual(result, [])
 
+    @patch('api.overseerr_api.get_existing_requests_for_tv_show')
     @patch('api.overseerr_api.get_tv_show_seasons_with_status')
-    def test_get_unavailable_seasons_success(self, mock_get_seasons):
-        """Test successful retrieval of unavailable seasons"""
+    async def test_get_requestable_seasons_success(self, mock_get_seasons, mock_get_requests):
+        """Test successful retrieval of requestable seasons"""
         # Mock detailed seasons data
         mock_get_seasons.return_value = [
             {'seasonNumber': 1, 'episodeCount': 10, 'status': 5, 'isAvailable': True},
             {'seasonNumber': 2, 'episodeCount': 12, 'status': 2, 'isAvailable': False},
             {'seasonNumber': 3, 'episodeCount': 8, 'status': 1, 'isAvailable': False}
         ]
+        # Season 1 has already been requested
+        mock_get_requests.return_value = [{'seasons': [{'seasonNumber': 1}]}]
         
         # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(get_unavailable_seasons(12345))
-        loop.close()
+        result = await get_requestable_seasons(12345)
         
-        # Should return only unavailable season numbers
+        # Should return only seasons that haven't been requested yet
         self.assertEqual(result, [2, 3])
 
+    @patch('api.overseerr_api.get_existing_requests_for_tv_show')
     @patch('api.overseerr_api.get_tv_show_seasons_with_status')
-    def test_get_unavailable_seasons_all_available(self, mock_get_seasons):
-        """Test when all seasons are already available"""
-        # Mock all seasons as available
+    async def test_get_requestable_seasons_all_requested(self, mock_get_seasons, mock_get_requests):
+        """Test when a request already covers the whole show"""
         mock_get_seasons.return_value = [
             {'seasonNumber': 1, 'episodeCount': 10, 'status': 5, 'isAvailable': True},
             {'seasonNumber': 2, 'episodeCount': 12, 'status': 5, 'isAvailable': True}
         ]
+        # A request without explicit seasons covers every season
+        mock_get_requests.return_value = [{'seasons': []}]
         
         # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(get_unavailable_seasons(12345))
-        loop.close()
+        result = await get_requestable_seasons(12345)
         
-        # Should return empty list when all seasons are available
+        # Should return empty list when nothing is left to request
         self.assertEqual(result, [])
 
-    @patch('handlers.ui_handlers.get_unavailable_seasons')
-    def test_build_media_details_message_tv_with_unavailable_seasons(self, mock_get_unavailable):
-        """Test UI generation for TV show with unavailable seasons"""
-        # Mock unavailable seasons
-        mock_get_unavailable.return_value = [2, 3]
-        
-        # Mock context
-        mock_context = Mock()
-        mock_context.user_data = {
-            'overseerr_telegram_user_id': 123,
-            'seasons_12345': [1, 2, 3]
-        }
-        
-        # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        media_text, keyboard = loop.run_until_complete(
-            build_media_details_message(self.sample_tv_show, mock_context, set())
-        )
-        loop.close()
-        
-        # Check that Request More button is included
-        button_texts = [button.text for row in keyboard for button in row]
-        self.assertIn("📥 Request More", button_texts)
-        
-        # Verify button callback data
-        request_more_button = None
-        for row in keyboard:
-            for button in row:
-                if button.text == "📥 Request More":
-                    request_more_button = button
-                    break
-        
-        self.assertIsNotNone(request_more_button)
-        self.assertEqual(request_more_button.callback_data, "request_more_12345")
 
-    @patch('handlers.ui_handlers.get_unavailable_seasons')
-    def test_build_media_details_message_tv_no_unavailable_seasons(self, mock_get_unavailable):
-        """Test UI generation for TV show with no unavailable seasons"""
-        # Mock no unavailable seasons
-        mock_get_unavailable.return_value = []
-        
-        # Mock context
-        mock_context = Mock()
-        mock_context.user_data = {
-            'overseerr_telegram_user_id': 123,
-            'seasons_12345': [1, 2, 3]
-        }
-        
-        # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        media_text, keyboard = loop.run_until_complete(
-            build_media_details_message(self.sample_tv_show, mock_context, set())
-        )
-        loop.close()
-        
-        # Check that Request More button is NOT included
-        button_texts = [button.text for row in keyboard for button in row]
-        self.assertNotIn("📥 Request More", button_texts)
-
-    @patch('handlers.ui_handlers.get_unavailable_seasons')
-    def test_build_media_details_message_movie_no_request_more(self, mock_get_unavailable):
-        """Test UI generation for movie (should never show Request More)"""
-        # Mock context
-        mock_context = Mock()
-        mock_context.user_data = {
-            'overseerr_telegram_user_id': 123
-        }
+class TestBuildMediaDetails(_RequestMoreSeasonsTestCase):
+    """Test cases for the Request More button in the media details UI"""
+    
+    async def test_build_media_details_message_request_more_button(self):
+        """Test the Request More button appears only for TV shows with requestable seasons"""
+        # (case, media, requestable seasons or raised error, button expected)
+        cases = [
+            ("tv with requestable seasons", self.sample_tv_show, [2, 3], True),
+            ("tv with no requestable seasons", self.sample_tv_show, [], False),
+            ("movie", self.sample_movie, None, False),
+            ("api error", self.sample_tv_show, Exception("API Error"), False),
+        ]
         
-        # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        media_text, keyboard = loop.run_until_complete(
-            build_media_details_message(self.sample_movie, mock_context, set())
-        )
-        loop.close()
-        
-        # Check that Request More button is NOT included for movies
-        button_texts = [button.text for row in keyboard for button in row]
-        self.assertNotIn("📥 Request More", button_texts)
-        
-        # get_unavailable_seasons should not be called for movies
-        mock_get_unavailable.assert_not_called()
+        for case, media, requestable, want_button in cases:
+            with self.subTest(case), \
+                    patch('handlers.ui_handlers.get_requestable_seasons') as mock_get_requestable, \
+                    patch('handlers.ui_handlers.user_can_request_4k', return_value=False):
+                if isinstance(requestable, Exception):
+                    mock_get_requestable.side_effect = requestable
+                else:
+                    mock_get_requestable.return_value = requestable
+                
+                mock_context = Mock(spec=CallbackContext)
+                mock_context.application.bot_data = {}
+                mock_context.user_data = {'overseerr_telegram_user_id': 123}
+                if media['mediaType'] == 'tv':
+                    mock_context.user_data['seasons_12345'] = [1, 2, 3]
+                
+                # Errors from the season lookup must not escape
+                media_text, keyboard = await build_media_details_message(media, mock_context, set())
+                
+                request_more_button = _find_button(keyboard, "📥 Request More")
+                if want_button:
+                    self.assertIsNotNone(request_more_button)
+                    self.assertEqual(request_more_button.callback_data, "request_more_12345")
+                else:
+                    self.assertIsNone(request_more_button)
+                
+                # get_requestable_seasons should not be called for movies
+                if media['mediaType'] == 'movie':
+                    mock_get_requestable.assert_not_called()
 
-    @patch('handlers.ui_handlers.get_unavailable_seasons')
-    def test_build_media_details_message_api_error_handling(self, mock_get_unavailable):
-        """Test UI generation handles API errors gracefully"""
-        # Mock API error
-        mock_get_unavailable.side_effect = Exception("API Error")
-        
-        # Mock context
-        mock_context = Mock()
-        mock_context.user_data = {
-            'overseerr_telegram_user_id': 123,
-            'seasons_12345': [1, 2, 3]
-        }
-        
-        # Run the async function - should not raise exception
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            media_text, keyboard = loop.run_until_complete(
-                build_media_details_message(self.sample_tv_show, mock_context, set())
-            )
-            # Should still return valid UI without Request More button
-            button_texts = [button.text for row in keyboard for button in row]
-            self.assertNotIn("📥 Request More", button_texts)
-        except Exception as e:
-            self.fail(f"build_media_details_message raised an exception: {e}")
-        finally:
-            loop.close()
 
-    @patch('api.overseerr_api.get_unavailable_seasons')
-    @patch('handlers.ui_handlers.build_media_details_message')
-    def test_handle_request_more_seasons_success(self, mock_build_message, mock_get_unavailable):
+class TestHandleRequestMore(_RequestMoreSeasonsTestCase):
+    """Test cases for the Request More callback handler"""
+    
+    @patch('api.overseerr_api.get_requestable_seasons')
+    @patch('handlers.ui_handlers.build_media_details_message', new_callable=AsyncMock)
+    async def test_handle_request_more_seasons_success(self, mock_build_message, mock_get_requestable):
         """Test successful handling of Request More callback"""
-        # Mock unavailable seasons
-        mock_get_unavailable.return_value = [2, 3]
+        # Mock requestable seasons
+        mock_get_requestable.return_value = [2, 3]
         
         # Mock UI generation
         mock_build_message.return_value = ("Test message", [])
         
         # Mock query and context
-        mock_query = AsyncMock()
-        mock_query.edit_message_caption = AsyncMock()
+        mock_query = AsyncMock(spec=CallbackQuery)
+        
+        mock_context = Mock(spec=CallbackContext)
         
-        mock_context = Mock()
+        mock_context.application.bot_data = {}
         mock_context.user_data = {
             'search_results': [self.sample_tv_show],
             'selected_seasons': [1]  # Should be cleared
         }
         
         # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(handle_request_more_seasons(mock_query, mock_context, 12345))
-        loop.close()
+        await handle_request_more_seasons(mock_query, mock_context, 12345)
         
-        # Verify unavailable seasons were cached
+        # Verify requestable seasons were cached
         self.assertEqual(mock_context.user_data['seasons_12345'], [2, 3])
         
         # Verify previous season selection was cleared
@@ -286,46 +203,86 @@ class TestRequestMoreSeasons(unittest.TestCase):
         # Verify UI was updated
         mock_query.edit_message_caption.assert_called_once()
 
-    @patch('api.overseerr_api.get_unavailable_seasons')
-    def test_handle_request_more_seasons_no_unavailable(self, mock_get_unavailable):
-        """Test handling when no unavailable seasons exist"""
-        # Mock no unavailable seasons
-        mock_get_unavailable.return_value = []
+    @patch('api.overseerr_api.get_requestable_seasons')
+    async def test_handle_request_more_seasons_no_unavailable(self, mock_get_requestable):
+        """Test handling when no requestable seasons exist"""
+        # Mock no requestable seasons
+        mock_get_requestable.return_value = []
         
         # Mock query
-        mock_query = AsyncMock()
-        mock_query.answer = AsyncMock()
+        mock_query = AsyncMock(spec=CallbackQuery)
         
-        mock_context = Mock()
+        mock_context = Mock(spec=CallbackContext)
+        
+        mock_context.application.bot_data = {}
         mock_context.user_data = {'search_results': [self.sample_tv_show]}
         
         # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(handle_request_more_seasons(mock_query, mock_context, 12345))
-        loop.close()
+        await handle_request_more_seasons(mock_query, mock_context, 12345)
         
         # Should show alert message
         mock_query.answer.assert_called_with("No more seasons available to request.", show_alert=True)
 
-    def test_handle_request_more_seasons_media_not_found(self):
+    @patch('api.overseerr_api.get_requestable_seasons')
+    async def test_handle_request_more_seasons_media_not_found(self, mock_get_requestable):
         """Test handling when media is not found in search results"""
+        mock_get_requestable.return_value = [2, 3]
         # Mock query
-        mock_query = AsyncMock()
-        mock_query.edit_message_text = AsyncMock()
+        mock_query = AsyncMock(spec=CallbackQuery)
+        
+        mock_context = Mock(spec=CallbackContext)
         
-        mock_context = Mock()
+        mock_context.application.bot_data = {}
         mock_context.user_data = {'search_results': []}  # Empty search results
         
         # Run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(handle_request_more_seasons(mock_query, mock_context, 12345))
-        loop.close()
+        await handle_request_more_seasons(mock_query, mock_context, 12345)
         
         # Should show error message
         mock_query.edit_message_text.assert_called_with("❌ Media not found.")
 
 
+class TestSharedSeasonsCache(_RequestMoreSeasonsTestCase):
+    """Test cases for the bot-wide season list cache used by the normal details view"""
+    
+    def _context(self, fetched_at):
+        mock_context = Mock(spec=CallbackContext)
+        mock_context.application.bot_data = {'seasons_cache': OrderedDict({12345: (fetched_at, [1, 2, 3])})}
+        mock_context.user_data = {
+            'overseerr_telegram_user_id': 123,
+            'search_results': [self.sample_tv_show]
+        }
+        return mock_context
+    
+    @patch('handlers.ui_handlers.time.monotonic', return_value=1000.0)
+    async def test_fresh_entry_is_served(self, _):
+        """Test that an entry younger than the TTL is returned"""
+        mock_context = self._context(fetched_at=1000.0 - SEASONS_CACHE_TTL + 1)
+        
+        self.assertEqual(get_cached_seasons(mock_context, 12345), [1, 2, 3])
+    
+    @patch('handlers.ui_handlers.time.monotonic', return_value=1000.0 + SEASONS_CACHE_TTL)
+    async def test_expired_entry_is_dropped(self, _):
+        """Test that an entry past the TTL is evicted so the next selection refetches it"""
+        mock_context = self._context(fetched_at=1000.0)
+        
+        self.assertIsNone(get_cached_seasons(mock_context, 12345))
+        self.assertNotIn(12345, mock_context.application.bot_data['seasons_cache'])
+    
+    @patch('handlers.ui_handlers.get_requestable_seasons', return_value=[])
+    @patch('handlers.ui_handlers.user_can_request_4k', return_value=False)
+    async def test_season_toggle_in_normal_view_stays_in_normal_mode(self, *_):
+        """Test that toggling a season from the shared cache keeps the normal details layout"""
+        mock_context = self._context(fetched_at=time.monotonic())
+        mock_query = AsyncMock(spec=CallbackQuery)
+        
+        await handle_season_toggle(mock_query, mock_context, 12345, 2)
+        
+        caption = mock_query.edit_message_caption.call_args.kwargs['caption']
+        self.assertNotIn("REQUEST MORE SEASONS", caption)
+        keyboard = mock_query.edit_message_caption.call_args.kwargs['reply_markup'].inline_keyboard
+        self.assertIsNotNone(_find_button(keyboard, "✅ Season 2"))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Unit tests for the cached session/selection file storage in session_manager.
+"""
+import asyncio
+import builtins
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import session.session_manager as session_manager
+
+
+class TestSessionFileCache(unittest.TestCase):
+    """Test cases for the mtime-keyed session file cache"""
+
+    def setUp(self):
+        """Redirect the session files into a temp directory and start with empty caches"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.sessions_file = os.path.join(self.tmp_dir.name, "user_sessions.json")
+        patcher = patch.multiple(
+            session_manager,
+            USER_SESSIONS_FILE=self.sessions_file,
+            USER_SELECTION_FILE=os.path.join(self.tmp_dir.name, "user_selection.json"),
+            SHARED_SESSION_FILE=os.path.join(self.tmp_dir.name, "shared_session.json")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._reset_caches()
+
+    def tearDown(self):
+        self._reset_caches()
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def _reset_caches():
+        for cache in (session_manager._sessions_cache, session_manager._selections_cache,
+                      session_manager._shared_cache):
+            cache.update(mtime=None, data=None, dirty=False, written=None)
+        session_manager._flush_handle = None
+        session_manager._flush_loop = None
+
+    def _write_file(self, content: str, mtime_ns: int):
+        with open(self.sessions_file, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.utime(self.sessions_file, ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_file_is_parsed_once(self):
+        """Test that repeated loads of an unchanged file are served from the cache"""
+        self._write_file('{"1": {"cookie": "a"}}', 1_700_000_000_000_000_000)
+
+        with patch.object(session_manager, "open", create=True, wraps=builtins.open) as mock_open:
+            first = session_manager.load_user_sessions()
+            second = session_manager.load_user_sessions()
+
+        self.assertEqual(first, second)
+        mock_open.assert_called_once()
+
+    def test_changed_mtime_reloads_file(self):
+        """Test that a file rewritten outside the bot is picked up on the next load"""
+        self._write_file('{"1": {"cookie": "a"}}', 1_700_000_000_000_000_000)
+        session_manager.load_user_sessions()
+
+        self._write_file('{"1": {"cookie": "b"}}', 1_700_000_001_000_000_000)
+
+        self.assertEqual(session_manager.load_user_session(1), {"cookie": "b"})
+
+    def test_loaders_return_copies(self):
+        """Test that mutating a loaded dict doesn't change the cached file contents"""
+        self._write_file('{"1": {"cookie": "a"}}', 1_700_000_000_000_000_000)
+
+        sessions = session_manager.load_user_sessions()
+        sessions["2"] = {"cookie": "x"}
+        session_manager.load_user_session(1)["cookie"] = "changed"
+
+        self.assertEqual(session_manager.load_user_sessions(), {"1": {"cookie": "a"}})
+        self.assertFalse(session_manager._sessions_cache["dirty"])
+
+    def test_dirty_data_served_until_flushed(self):
+        """Test that saves inside the event loop are visible immediately and written on flush"""
+        async def save_and_load():
+            session_manager.save_user_session(1, {"cookie": "a"})
+            return session_manager.load_user_session(1), os.path.exists(self.sessions_file)
+
+        loaded, written_before_flush = asyncio.run(save_and_load())
+        session_manager.flush_sessions()
+
+        self.assertEqual(loaded, {"cookie": "a"})
+        self.assertFalse(written_before_flush)
+        self.assertFalse(session_manager._sessions_cache["dirty"])
+        with open(self.sessions_file, "rb") as f:
+            self.assertEqual(session_manager.loads(f.read()), {"1": {"cookie": "a"}})
+
+    def test_rapid_saves_coalesce_into_one_write(self):
+        """Test that a burst of saves inside the event loop is flushed with a single disk write"""
+        async def burst():
+            for telegram_user_id in (1, 2, 3):
+                session_manager.save_user_session(telegram_user_id, {"cookie": str(telegram_user_id)})
+            await asyncio.sleep(0.1)
+
+        with patch.object(session_manager, "FLUSH_DELAY", 0.01), \
+                patch.object(session_manager, "_atomic_write", wraps=session_manager._atomic_write) as mock_write:
+            # asyncio.run waits for the default executor, where the flush runs
+            asyncio.run(burst())
+
+        mock_write.assert_called_once()
+        self.assertEqual(sorted(session_manager.load_user_sessions()), ["1", "2", "3"])
+        self.assertFalse(session_manager._sessions_cache["dirty"])
+
+    def test_failed_atomic_write_keeps_old_file_and_removes_temp(self):
+        """Test that a write failing mid-way leaves the previous file intact and no .tmp behind"""
+        self._write_file('{"1": {"cookie": "a"}}', 1_700_000_000_000_000_000)
+
+        with patch("os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                session_manager._atomic_write(self.sessions_file, b'{"1": {"cookie": "b"}}')
+
+        self.assertEqual(session_manager.load_user_session(1), {"cookie": "a"})
+        self.assertFalse(os.path.exists(self.sessions_file + ".tmp"))
+
+    def test_saved_user_picks_up_external_edit(self):
+        """Test that user_selection.json edited outside the bot is seen by the next lookup"""
+        selection_file = session_manager.USER_SELECTION_FILE
+        for user_name, mtime_ns in (("Old", 1_700_000_000_000_000_000), ("New", 1_700_000_001_000_000_000)):
+            with open(selection_file, "w", encoding="utf-8") as f:
+                f.write('{"1": {"userId": 10, "userName": "%s"}}' % user_name)
+            os.utime(selection_file, ns=(mtime_ns, mtime_ns))
+
+            self.assertEqual(session_manager.get_saved_user_for_telegram_id(1), (10, user_name))
+        self.assertEqual(session_manager.get_saved_user_for_telegram_id(2), (None, None))
+
+    def test_save_off_loop_during_flush_does_not_deadlock(self):
+        """Test that a save from a worker thread can't deadlock with a flush holding the disk lock"""
+        saver_flushing = threading.Event()
+        real_flush_sessions = session_manager.flush_sessions
+
+        def flush_after_signal():
+            saver_flushing.set()
+            real_flush_sessions()
+
+        def executor_flush():
+            # Same lock order as _flush: the disk lock, then the cache lock after the write
+            with session_manager._disk_lock:
+                saver_flushing.wait(timeout=2)
+                with session_manager._cache_lock:
+                    pass
+
+        flusher = threading.Thread(target=executor_flush, daemon=True)
+        saver = threading.Thread(target=session_manager.save_user_session, args=(1, {"cookie": "a"}), daemon=True)
+        with patch.object(session_manager, "flush_sessions", side_effect=flush_after_signal):
+            flusher.start()
+            saver.start()
+            saver.join(timeout=5)
+            flusher.join(timeout=5)
+
+        self.assertFalse(saver.is_alive())
+        self.assertFalse(flusher.is_alive())
+        self.assertEqual(session_manager.load_user_session(1), {"cookie": "a"})
+
+
+if __name__ == '__main__':
+    unittest.main()
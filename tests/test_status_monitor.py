@@ -0,0 +1,61 @@
+"""
+Unit tests for the request status monitor's tracked-request persistence.
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from notifications.status_monitor import RequestStatusMonitor
+
+
+class TestTrackedRequestPersistence(unittest.TestCase):
+    """Test cases for loading and saving tracked request statuses"""
+
+    def setUp(self):
+        """Point the monitor at a throwaway status file"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.monitor = RequestStatusMonitor(Mock())
+        self.monitor.status_file = os.path.join(self.tmp_dir.name, "data", "request_status.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_missing_file_returns_empty(self):
+        """Test that a missing status file loads as no tracked requests"""
+        self.assertEqual(self.monitor.load_tracked_requests(), {})
+
+    def test_save_then_load_round_trip(self):
+        """Test that saved requests are read back unchanged, creating the data directory"""
+        tracked = {"123": {"chat_id": 42, "status": "pending"}}
+
+        self.monitor.save_tracked_requests(tracked)
+
+        self.assertEqual(self.monitor.load_tracked_requests(), tracked)
+        self.assertFalse(os.path.exists(self.monitor.status_file + ".tmp"))
+
+    def test_stop_monitoring_flushes_pending_changes(self):
+        """Test that requests tracked since the last flush are written on stop"""
+        self.monitor.track_request(7, chat_id=99)
+
+        self.monitor.stop_monitoring()
+
+        self.assertEqual(self.monitor.load_tracked_requests()["7"]["chat_id"], 99)
+
+    def test_failed_flush_keeps_changes_pending(self):
+        """Test that a write failure leaves the changes dirty so a later flush still saves them"""
+        self.monitor.track_request(7, chat_id=99)
+
+        with patch("os.replace", side_effect=OSError("disk full")):
+            asyncio.run(self.monitor.flush())
+        self.assertTrue(self.monitor._dirty)
+
+        asyncio.run(self.monitor.flush())
+
+        self.assertFalse(self.monitor._dirty)
+        self.assertEqual(self.monitor.load_tracked_requests()["7"]["chat_id"], 99)
+
+
+if __name__ == '__main__':
+    unittest.main()
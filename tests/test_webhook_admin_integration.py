@@ -15,12 +15,17 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 class TestWebhookAdminIntegration(unittest.TestCase):
     """Test cases for webhook integration with admin notifications"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.mock_bot = Mock()
-        
+    def tearDown(self):
+        """Reset the shared mock bot so no calls or stubs leak into the next test"""
+        self.mock_bot.reset_mock(return_value=True, side_effect=True)
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up the mock bot and sample webhook payloads once; tests only read them"""
+        cls.mock_bot = Mock()
+
         # Sample webhook payloads for different Overseerr events
-        self.new_request_webhook = {
+        cls.new_request_webhook = {
             "notification_type": "MEDIA_PENDING",
             "event": "request.new",
             "subject": "The Matrix (1999)",
@@ -55,7 +60,7 @@ class TestWebhookAdminIntegration(unittest.TestCase):
             }
         }
         
-        self.approved_request_webhook = {
+        cls.approved_request_webhook = {
             "notification_type": "MEDIA_APPROVED", 
             "event": "request.approved",
             "subject": "The Matrix (1999)",
@@ -82,6 +87,10 @@ class TestWebhookAdminIntegration(unittest.TestCase):
             }
         }
 
+        # Parsed once and shared by every test that consumes the new-request payload
+        from notifications.webhook_handler import extract_notification_fields
+        cls.parsed_request = extract_notification_fields(cls.new_request_webhook)
+
     def test_identify_new_request_events(self):
         """Test identification of new request webhook events"""
         # Test that webhook processor correctly identifies:
@@ -98,7 +107,11 @@ class TestWebhookAdminIntegration(unittest.TestCase):
         # - Requesting user details
         # - Request quality (HD/4K)
         # - Timestamp and other metadata
-        pass
+        self.assertEqual(self.parsed_request.notification_type, "MEDIA_PENDING")
+        self.assertEqual(self.parsed_request.request_id, 123)
+        self.assertEqual(self.parsed_request.title, "The Matrix (1999)")
+        self.assertEqual(self.parsed_request.media_type, "movie")
+        self.assertEqual(self.parsed_request.requested_by, "John Doe")
     
     def test_webhook_data_validation(self):
         """Test validation of webhook data completeness"""
@@ -117,7 +130,32 @@ class TestWebhookAdminIntegration(unittest.TestCase):
         # - Declined requests (MEDIA_DECLINED) -> No admin notification  
         # - Available media (MEDIA_AVAILABLE) -> No admin notification
         pass
-    
+
+    def test_duplicate_webhook_detection(self):
+        """Test that retried webhooks for the same event are recognised as duplicates"""
+        from notifications.webhook_handler import is_duplicate_webhook, _seen_webhooks
+
+        _seen_webhooks.clear()
+        self.assertFalse(is_duplicate_webhook(self.new_request_webhook))
+        self.assertTrue(is_duplicate_webhook(self.new_request_webhook))
+        # A different event for the same request is not a duplicate
+        self.assertFalse(is_duplicate_webhook(self.approved_request_webhook))
+        _seen_webhooks.clear()
+
+    def test_webhooks_without_request_id_never_deduplicated(self):
+        """Test that issue/test webhooks, which carry no request id, are all let through"""
+        from notifications.webhook_handler import is_duplicate_webhook, _seen_webhooks
+
+        _seen_webhooks.clear()
+        first_issue = {"notification_type": "ISSUE_CREATED", "subject": "The Matrix (1999)",
+                       "issue": {"issue_id": 1}}
+        second_issue = {"notification_type": "ISSUE_CREATED", "subject": "Breaking Bad (2008)",
+                        "issue": {"issue_id": 2}}
+        self.assertFalse(is_duplicate_webhook(first_issue))
+        self.assertFalse(is_duplicate_webhook(second_issue))
+        self.assertEqual(len(_seen_webhooks), 0)
+        _seen_webhooks.clear()
+
     async def test_webhook_to_admin_notification_flow(self):
         """Test end-to-end flow from webhook to admin notification"""
         # Integration test for:
@@ -150,10 +188,11 @@ class TestWebhookAdminIntegration(unittest.TestCase):
 class TestWebhookEventTypes(unittest.TestCase):
     """Test cases for different Overseerr webhook event types"""
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up test fixtures for various webhook types"""
         # Based on Overseerr documentation, expected event types include:
-        self.webhook_event_types = {
+        cls.webhook_event_types = {
             "new_request": {
                 "notification_type": "MEDIA_PENDING",
                 "event": "request.new",
@@ -213,9 +252,10 @@ class TestWebhookEventTypes(unittest.TestCase):
 class TestNotificationMessageFormatting(unittest.TestCase):
     """Test cases for admin notification message formatting"""
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up test fixtures for message formatting"""
-        self.sample_movie_request = {
+        cls.sample_movie_request = {
             "media": {
                 "media_type": "movie",
                 "title": "The Matrix",
@@ -232,7 +272,7 @@ class TestNotificationMessageFormatting(unittest.TestCase):
             }
         }
         
-        self.sample_tv_request = {
+        cls.sample_tv_request = {
             "media": {
                 "media_type": "tv",
                 "title": "Breaking Bad",
@@ -1,8 +1,20 @@
-# Utilities package
-# NOTE: version.py is intentionally NOT imported here to avoid dependency issues in CI/CD
-from .health_check import health_checker
-
-# Only import telegram_utils and user_loader when explicitly needed
-# This prevents dependency issues when importing utils.version in GitHub Actions
-
-__all__ = ['health_checker']
+# Utilities package
+# NOTE: version.py is intentionally NOT imported eagerly here to avoid dependency issues in CI/CD
+
+# telegram_utils and user_loader are never re-exported here; import them explicitly when needed
+# This prevents dependency issues when importing utils.version in GitHub Actions
+
+__all__ = ['health_checker']
+
+
+def __getattr__(name):
+    # Load health_check on first use (PEP 562): building the global HealthChecker creates
+    # the data directory, which submodule-only imports like utils.version shouldn't trigger
+    if name == 'health_checker':
+        from .health_check import health_checker
+        return health_checker
+    # utils.version is dependency-free, so `from utils import VERSION` stays safe in CI
+    if name == 'VERSION':
+        from .version import VERSION
+        return VERSION
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,123 +5,147 @@ Provides standardized error handling, retry mechanisms, and user-friendly error
 import logging
 import asyncio
 import functools
-from typing import Optional, Callable, Any, Tuple
+import random
+import time
+from typing import Optional, Callable, Any, Iterator, Tuple
 import requests
-from requests.exceptions import RequestException, Timeout, ConnectionError
+from requests.exceptions import RequestException, Timeout, ConnectTimeout, ConnectionError
 
 logger = logging.getLogger(__name__)
 
 
+_TIMEOUT_MESSAGE = "⏱️ **Connection timeout.** The server is taking too long to respond. Please try again later."
+
+# User-facing messages for HTTP status codes, falling back to a generic message
+_HTTP_MESSAGES = {
+    401: "🔐 **Authentication failed.** Invalid API key or session expired.",
+    403: "🚫 **Access denied.** You don't have permission for this action.",
+    404: "❓ **Not found.** The requested item could not be found.",
+    500: "⚠️ **Server error.** The Overseerr server encountered an internal error."
+}
+
+
+def _http_error_message(error: requests.HTTPError) -> str:
+    status_code = getattr(error.response, 'status_code', None)
+    return _HTTP_MESSAGES.get(status_code, f"❌ **Request failed** (Error {status_code}). Please try again later.")
+
+
+# Message builders keyed by exception class; looked up along the error's MRO.
+# ConnectTimeout is both a ConnectionError and a Timeout and is reported as a timeout.
+_ERROR_MESSAGES = {
+    ConnectTimeout: lambda error: _TIMEOUT_MESSAGE,
+    Timeout: lambda error: _TIMEOUT_MESSAGE,
+    ConnectionError: lambda error: "🌐 **Connection failed.** Unable to reach the Overseerr server. Please check your connection.",
+    requests.HTTPError: _http_error_message,
+    RequestException: lambda error: "🔌 **Network error.** Please check your internet connection and try again."
+}
+
+
 class ErrorHandler:
     """Centralized error handling for bot operations."""
     
     @staticmethod
     def get_user_friendly_message(error: Exception) -> str:
         """Convert technical errors to user-friendly messages."""
-        if isinstance(error, Timeout):
-            return "⏱️ **Connection timeout.** The server is taking too long to respond. Please try again later."
-        
-        elif isinstance(error, ConnectionError):
-            return "🌐 **Connection failed.** Unable to reach the Overseerr server. Please check your connection."
-        
-        elif isinstance(error, requests.HTTPError):
-            status_code = getattr(error.response, 'status_code', None)
-            if status_code == 401:
-                return "🔐 **Authentication failed.** Invalid API key or session expired."
-            elif status_code == 403:
-                return "🚫 **Access denied.** You don't have permission for this action."
-            elif status_code == 404:
-                return "❓ **Not found.** The requested item could not be found."
-            elif status_code == 500:
-                return "⚠️ **Server error.** The Overseerr server encountered an internal error."
-            else:
-                return f"❌ **Request failed** (Error {status_code}). Please try again later."
-        
-        elif isinstance(error, RequestException):
-            return "🔌 **Network error.** Please check your internet connection and try again."
-        
-        else:
-            return "❌ **Unexpected error occurred.** Please try again later."
+        for cls in type(error).__mro__:
+            build_message = _ERROR_MESSAGES.get(cls)
+            if build_message is not None:
+                return build_message(error)
+        return "❌ **Unexpected error occurred.** Please try again later."
     
     @staticmethod
     def log_error(operation: str, error: Exception, context: dict = None):
         """Log detailed error information for debugging."""
-        context_str = f" Context: {context}" if context else ""
-        logger.error(f"Error in {operation}: {type(error).__name__}: {error}{context_str}")
+        # Lazy %-formatting: the (possibly large) context repr is only built if the record is emitted
+        if context:
+            logger.error("Error in %s: %s: %s Context: %s", operation, type(error).__name__, error, context)
+        else:
+            logger.error("Error in %s: %s: %s", operation, type(error).__name__, error)
         
-        # Log stack trace for unexpected errors
-        if not isinstance(error, (RequestException, ValueError, KeyError)):
-            logger.exception(f"Unexpected error in {operation}")
+        # Log stack trace for unexpected errors; formatting it is costly, so only at DEBUG
+        if not isinstance(error, (RequestException, ValueError, KeyError)) and logger.isEnabledFor(logging.DEBUG):
+            logger.exception("Unexpected error in %s", operation)
+
+
+# HTTP statuses that will not change on retry
+_TERMINAL_STATUS_CODES = frozenset({401, 403, 404})
+
+
+def _is_terminal(error: Exception) -> bool:
+    """Return True for errors that retrying cannot fix."""
+    if not isinstance(error, requests.HTTPError):
+        return False
+    return getattr(error.response, 'status_code', None) in _TERMINAL_STATUS_CODES
+
+
+def _retry_delays(max_attempts: int, delay: float, backoff_factor: float) -> Iterator[float]:
+    """Yield the pause before each retry: the first is immediate, later ones back off with jitter."""
+    if max_attempts > 1:
+        yield 0.0
+    current_delay = delay
+    for _ in range(max_attempts - 2):
+        yield current_delay * random.uniform(0.5, 1.5)
+        current_delay *= backoff_factor
+
+
+def _next_retry_delay(func_name: str, attempt: int, error: Exception, delays: Iterator[float]) -> Optional[float]:
+    """Return how long to wait before retrying after a failed attempt, or None to give up."""
+    if _is_terminal(error):
+        return None
+    wait = next(delays, None)
+    if wait is None:
+        logger.error(f"All {attempt} attempts failed for {func_name}")
+        return None
+    logger.warning(f"Attempt {attempt} failed for {func_name}: {error}. Retrying in {wait:.1f}s...")
+    return wait
 
 
 def with_retry(max_attempts: int = 3, delay: float = 1.0, backoff_factor: float = 2.0):
     """
     Decorator to add retry logic to functions.
     
+    The first retry happens immediately (transient blips usually clear at once);
+    later retries wait with exponential backoff and random jitter.
+    
     Args:
         max_attempts: Maximum number of retry attempts
         delay: Initial delay between retries in seconds
         backoff_factor: Multiplier for delay after each failed attempt
     """
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            last_exception = None
-            current_delay = delay
-            
-            for attempt in range(max_attempts):
-                try:
-                    if asyncio.iscoroutinefunction(func):
+        # Pick the wrapper once at decoration time rather than inspecting func on every call
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                delays = _retry_delays(max_attempts, delay, backoff_factor)
+                attempt = 0
+                while True:
+                    attempt += 1
+                    try:
                         return await func(*args, **kwargs)
-                    else:
-                        return func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    
-                    # Don't retry certain errors
-                    if isinstance(e, (requests.HTTPError,)) and hasattr(e, 'response'):
-                        if e.response.status_code in [401, 403, 404]:
-                            break
-                    
-                    if attempt < max_attempts - 1:
-                        logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {e}. Retrying in {current_delay}s...")
-                        await asyncio.sleep(current_delay)
-                        current_delay *= backoff_factor
-                    else:
-                        logger.error(f"All {max_attempts} attempts failed for {func.__name__}")
+                    except Exception as e:
+                        wait = _next_retry_delay(func.__name__, attempt, e, delays)
+                        if wait is None:
+                            raise
+                    await asyncio.sleep(wait)
             
-            raise last_exception
+            return async_wrapper
         
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            last_exception = None
-            current_delay = delay
-            
-            for attempt in range(max_attempts):
+            delays = _retry_delays(max_attempts, delay, backoff_factor)
+            attempt = 0
+            while True:
+                attempt += 1
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    last_exception = e
-                    
-                    # Don't retry certain errors
-                    if isinstance(e, (requests.HTTPError,)) and hasattr(e, 'response'):
-                        if e.response.status_code in [401, 403, 404]:
-                            break
-                    
-                    if attempt < max_attempts - 1:
-                        logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {e}. Retrying in {current_delay}s...")
-                        import time
-                        time.sleep(current_delay)
-                        current_delay *= backoff_factor
-                    else:
-                        logger.error(f"All {max_attempts} attempts failed for {func.__name__}")
-            
-            raise last_exception
+                    wait = _next_retry_delay(func.__name__, attempt, e, delays)
+                    if wait is None:
+                        raise
+                time.sleep(wait)
         
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        else:
-            return sync_wrapper
+        return sync_wrapper
     
     return decorator
 
@@ -134,6 +158,23 @@ def safe_api_call(operation: str) -> Callable:
         operation: Description of the operation for logging
     """
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Tuple[bool, Any, Optional[str]]:
+                """
+                Returns:
+                    Tuple of (success: bool, result: Any, error_message: Optional[str])
+                """
+                try:
+                    result = await func(*args, **kwargs)
+                    return True, result, None
+                except Exception as e:
+                    ErrorHandler.log_error(operation, e, {"args": args, "kwargs": kwargs})
+                    user_message = ErrorHandler.get_user_friendly_message(e)
+                    return False, None, user_message
+            
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Tuple[bool, Any, Optional[str]]:
             """
@@ -148,26 +189,6 @@ def safe_api_call(operation: str) -> Callable:
                 user_message = ErrorHandler.get_user_friendly_message(e)
                 return False, None, user_message
         
-        @functools.wraps(func)
-        async def async_wrapper(*args, **kwargs) -> Tuple[bool, Any, Optional[str]]:
-            """
-            Returns:
-                Tuple of (success: bool, result: Any, error_message: Optional[str])
-            """
-            try:
-                if asyncio.iscoroutinefunction(func):
-                    result = await func(*args, **kwargs)
-                else:
-                    result = func(*args, **kwargs)
-                return True, result, None
-            except Exception as e:
-                ErrorHandler.log_error(operation, e, {"args": args, "kwargs": kwargs})
-                user_message = ErrorHandler.get_user_friendly_message(e)
-                return False, None, user_message
-        
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        else:
-            return wrapper
+        return wrapper
     
     return decorator
@@ -1,6 +1,7 @@
 """
 Health check utilities for Docker container monitoring.
 """
+import asyncio
 import os
 import time
 import threading
@@ -12,11 +13,15 @@ logger = logging.getLogger(__name__)
 class HealthChecker:
     """Manages health check file for Docker container monitoring."""
     
-    def __init__(self, health_file_path="data/bot_health.txt"):
+    def __init__(self, health_file_path="data/bot_health.txt", update_interval=30, on_update=None):
         self.health_file_path = health_file_path
-        self.update_interval = 30  # Update every 30 seconds
+        self.update_interval = update_interval  # Seconds between health file updates
+        self.on_update = on_update  # Optional threading.Event set after each write
+        self.last_heartbeat = None  # time.monotonic() of the latest heartbeat
         self.is_running = False
         self.thread = None
+        self._task = None
+        self._stop_event = threading.Event()  # Wakes the monitor thread on shutdown
         self._ensure_health_file_directory()
     
     def _ensure_health_file_directory(self):
@@ -27,13 +32,52 @@ class HealthChecker:
     
     def create_health_file(self):
         """Create or update the health file with current timestamp."""
+        self.last_heartbeat = time.monotonic()
         try:
             with open(self.health_file_path, 'w') as f:
                 f.write(f"Bot is healthy at {datetime.now(timezone.utc).isoformat()}\n")
             logger.debug(f"Health file updated: {self.health_file_path}")
+            if self.on_update is not None:
+                self.on_update.set()
         except Exception as e:
             logger.error(f"Failed to update health file: {e}")
     
+    def touch_health_file(self):
+        """Refresh the health file's mtime, recreating the file if it has gone missing."""
+        self.last_heartbeat = time.monotonic()
+        try:
+            os.utime(self.health_file_path, None)
+        except FileNotFoundError:
+            self.create_health_file()
+            return
+        except Exception as e:
+            logger.error(f"Failed to touch health file: {e}")
+            return
+        if self.on_update is not None:
+            self.on_update.set()
+    
+    def is_healthy(self, max_age=120):
+        """Return True if a heartbeat was recorded within the last max_age seconds."""
+        return self.last_heartbeat is not None and time.monotonic() - self.last_heartbeat <= max_age
+    
+    async def run(self):
+        """Keep the health file and heartbeat fresh from the event loop until stopped."""
+        self.create_health_file()
+        while self.is_running:
+            await asyncio.sleep(self.update_interval)
+            self.touch_health_file()
+    
+    def start_health_monitor_async(self, loop=None):
+        """Start health monitoring as a task on the given (or running) event loop."""
+        if self.is_running:
+            logger.warning("Health monitor is already running")
+            return
+        
+        self.is_running = True
+        loop = loop or asyncio.get_running_loop()
+        self._task = loop.create_task(self.run())
+        logger.info("Health monitor started")
+    
     def start_health_monitor(self):
         """Start the health monitoring thread."""
         if self.is_running:
@@ -41,6 +85,7 @@ class HealthChecker:
             return
         
         self.is_running = True
+        self._stop_event.clear()
         self.thread = threading.Thread(target=self._health_monitor_loop, daemon=True)
         self.thread.start()
         logger.info("Health monitor started")
@@ -51,8 +96,24 @@ class HealthChecker:
     def stop_health_monitor(self):
         """Stop the health monitoring thread."""
         self.is_running = False
+        self._stop_event.set()
         if self.thread:
             self.thread.join(timeout=5)
+        # The task's loop may already be closed at interpreter exit; cancelling then raises
+        if self._task is not None and not self._task.done() and not self._task.get_loop().is_closed():
+            self._task.cancel()
+        logger.info("Health monitor stopped")
+    
+    async def stop_health_monitor_async(self):
+        """Cancel the heartbeat task and wait for it to finish, while its event loop is still running."""
+        self.is_running = False
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
         logger.info("Health monitor stopped")
     
     def _health_monitor_loop(self):
@@ -60,10 +121,11 @@ class HealthChecker:
         while self.is_running:
             try:
                 self.create_health_file()
-                time.sleep(self.update_interval)
+                if self._stop_event.wait(self.update_interval):
+                    break
             except Exception as e:
                 logger.error(f"Error in health monitor loop: {e}")
-                time.sleep(5)  # Short sleep on error
+                self._stop_event.wait(5)  # Short pause on error
     
     def cleanup_health_file(self):
         """Remove the health file on shutdown."""
@@ -74,5 +136,6 @@ class HealthChecker:
         except Exception as e:
             logger.error(f"Failed to cleanup health file: {e}")
 
-# Global health checker instance
+# Global health checker instance. The Docker HEALTHCHECK reads its file; the webhook
+# server's /healthz endpoint, when that server is running, reports the same heartbeat.
 health_checker = HealthChecker()
@@ -0,0 +1,31 @@
+"""
+JSON helpers backed by orjson when it is installed, falling back to the stdlib json module.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can catch this for both
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data):
+    """Parse JSON from str or bytes."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON bytes, ready to write to a socket or binary file."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj, indent: bool = False) -> str:
+    """Serialize obj to a JSON string."""
+    return dumps_bytes(obj, indent).decode("utf-8")
@@ -1,45 +1,69 @@
-"""
-User data loading and management utilities.
-"""
-import logging
-from telegram import Update
-from telegram.ext import ContextTypes
-
-from config.constants import CURRENT_MODE, BotMode
-from session.session_manager import load_user_session, get_saved_user_for_telegram_id, load_shared_session
-
-logger = logging.getLogger(__name__)
-
-async def user_data_loader(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """
-    Load user data, including session data and user selections, at the start of each update.
-    Ensures overseerr_user_id is available across restarts.
-    """
-    telegram_user_id = update.effective_user.id if update.effective_user else update.callback_query.from_user.id
-    logger.info(f"Loading user data for Telegram user {telegram_user_id} in mode {CURRENT_MODE.value}")
-
-    # Normal mode: Load session data
-    if CURRENT_MODE == BotMode.NORMAL:
-        session_data = load_user_session(telegram_user_id)
-        if session_data and "cookie" in session_data:
-            context.user_data["session_data"] = session_data
-            context.user_data["overseerr_user_id"] = session_data["overseerr_telegram_user_id"]  # Fixed key name
-            context.user_data["overseerr_user_name"] = session_data.get("overseerr_user_name", "Unknown")
-            logger.info(f"Loaded Normal mode session for user {telegram_user_id}: {session_data['overseerr_telegram_user_id']}")
-
-    # API mode: Load user selection
-    elif CURRENT_MODE == BotMode.API:
-        overseerr_user_id, overseerr_user_name = get_saved_user_for_telegram_id(telegram_user_id)
-        if overseerr_user_id:
-            context.user_data["overseerr_user_id"] = overseerr_user_id
-            context.user_data["overseerr_user_name"] = overseerr_user_name
-            logger.info(f"Loaded API mode user selection for {telegram_user_id}: {overseerr_user_id} ({overseerr_user_name})")
-
-    # Shared mode: Load shared session (global)
-    elif CURRENT_MODE == BotMode.SHARED:
-        shared_session = load_shared_session()
-        if shared_session and "cookie" in shared_session:
-            context.application.bot_data["shared_session"] = shared_session
-            context.user_data["overseerr_user_id"] = shared_session["overseerr_telegram_user_id"]  # Fixed key name
-            context.user_data["overseerr_user_name"] = shared_session.get("overseerr_user_name", "Shared User")
-            logger.info(f"Loaded Shared mode session for user {telegram_user_id}: {shared_session['overseerr_telegram_user_id']}")
+"""
+User data loading and management utilities.
+"""
+import asyncio
+import logging
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from config.constants import CURRENT_MODE, BotMode
+from session.session_manager import load_user_session, get_saved_user_for_telegram_id, load_shared_session
+
+logger = logging.getLogger(__name__)
+
+# Session loaders read and parse JSON files; they run off the event loop so other updates aren't blocked.
+# PTB keeps user_data/bot_data in memory between updates, so once a session is there it is reused
+# (identity is refreshed from it) and the file is only read again after logout clears it.
+
+async def _load_normal(telegram_user_id: int, context: ContextTypes.DEFAULT_TYPE):
+    """Normal mode: load the user's own Overseerr session."""
+    session_data = context.user_data.get("session_data")
+    if not (session_data and "cookie" in session_data):
+        logger.info("Loading user data for Telegram user %s in mode %s", telegram_user_id, BotMode.NORMAL.value)
+        session_data = await asyncio.to_thread(load_user_session, telegram_user_id)
+        if not (session_data and "cookie" in session_data):
+            return
+        context.user_data["session_data"] = session_data
+        logger.info("Loaded Normal mode session for user %s: %s", telegram_user_id, session_data["overseerr_telegram_user_id"])
+    context.user_data["overseerr_user_id"] = session_data["overseerr_telegram_user_id"]  # Fixed key name
+    context.user_data["overseerr_user_name"] = session_data.get("overseerr_user_name", "Unknown")
+
+async def _load_api(telegram_user_id: int, context: ContextTypes.DEFAULT_TYPE):
+    """API mode: load the Overseerr user this Telegram user selected."""
+    if context.user_data.get("overseerr_user_id"):
+        return
+    logger.info("Loading user data for Telegram user %s in mode %s", telegram_user_id, BotMode.API.value)
+    overseerr_user_id, overseerr_user_name = await asyncio.to_thread(get_saved_user_for_telegram_id, telegram_user_id)
+    if overseerr_user_id:
+        context.user_data["overseerr_user_id"] = overseerr_user_id
+        context.user_data["overseerr_user_name"] = overseerr_user_name
+        logger.info("Loaded API mode user selection for %s: %s (%s)", telegram_user_id, overseerr_user_id, overseerr_user_name)
+
+async def _load_shared(telegram_user_id: int, context: ContextTypes.DEFAULT_TYPE):
+    """Shared mode: load the global shared session."""
+    shared_session = context.application.bot_data.get("shared_session")
+    if not (shared_session and "cookie" in shared_session):
+        logger.info("Loading user data for Telegram user %s in mode %s", telegram_user_id, BotMode.SHARED.value)
+        shared_session = await asyncio.to_thread(load_shared_session)
+        if not (shared_session and "cookie" in shared_session):
+            return
+        context.application.bot_data["shared_session"] = shared_session
+        logger.info("Loaded Shared mode session for user %s: %s", telegram_user_id, shared_session["overseerr_telegram_user_id"])
+    context.user_data["overseerr_user_id"] = shared_session["overseerr_telegram_user_id"]  # Fixed key name
+    context.user_data["overseerr_user_name"] = shared_session.get("overseerr_user_name", "Shared User")
+
+_MODE_LOADERS = {
+    BotMode.NORMAL: _load_normal,
+    BotMode.API: _load_api,
+    BotMode.SHARED: _load_shared
+}
+
+async def user_data_loader(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Load user data, including session data and user selections, at the start of each update.
+    Ensures overseerr_user_id is available across restarts.
+    """
+    telegram_user_id = update.effective_user.id if update.effective_user else update.callback_query.from_user.id
+    loader = _MODE_LOADERS.get(CURRENT_MODE)
+    if loader is not None:
+        await loader(telegram_user_id, context)
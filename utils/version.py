@@ -3,23 +3,27 @@ Standalone version reader for GitHub Actions workflows.
 This file MUST NOT import any other local modules to avoid dependency issues.
 """
 
+import re
 from pathlib import Path
 
+PYPROJECT_PATH = Path(__file__).resolve().parent.parent / "pyproject.toml"  # Resolved once at import
+_VERSION_RE = re.compile(rb'^version\s*=\s*"([^"]+)"', re.MULTILINE)
+# Parsed version, reused until pyproject.toml's mtime changes
+_version_cache = {"mtime": None, "version": None}
+
 
 def get_version():
-    """Get version from pyproject.toml without any external dependencies"""
+    """Get version from pyproject.toml without any external dependencies (re-read only when the file changes)"""
     try:
-        pyproject_path = Path(__file__).parent.parent / "pyproject.toml"
-        
-        # Simple text parsing - most reliable for CI/CD
-        with open(pyproject_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('version = "') and line.endswith('"'):
-                    # Extract version between quotes
-                    return line.split('"')[1]
+        mtime = PYPROJECT_PATH.stat().st_mtime_ns
+        if mtime == _version_cache["mtime"]:
+            return _version_cache["version"]
         
-        return "0.0.0"  # Fallback if not found
+        # One regex scan over the raw bytes - no TOML parser needed in CI/CD
+        match = _VERSION_RE.search(PYPROJECT_PATH.read_bytes())
+        version = match.group(1).decode("ascii") if match else "0.0.0"  # Fallback if not found
+        _version_cache.update(mtime=mtime, version=version)
+        return version
         
     except Exception:
         return "0.0.0"  # Fallback on any error